@@ -1,7 +1,16 @@
+import os
+import sys
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from datastore import MASTER_FILE, file_sha256, load_dataset, load_schedule
+from draft_analysis import MAX_PER_TEAM
+from aggregates import (RECORD_FILTERS, RECORD_PAGE_SIZE, RECORD_SORT_COLUMNS, build_aggregates, filter_records,
+                        load_aggregates, page_records, save_aggregates)
+from metrics import profiled, stage
+from scoring import DEFAULT_RULES, compare_rules, load_rules
+
 # --- 1. CONFIG & COMPACT STYLING ---
 st.set_page_config(layout="wide", page_title="WJC Fantasy")
 
@@ -47,130 +56,219 @@ COUNTRY_COLORS = {
 }
 
 
-def load_and_clean_data():
-    df = pd.read_csv("data/dynamic/Final_Master_Dataset.csv")
-    df['fantasypoints'] = pd.to_numeric(df['FP'], errors='coerce').fillna(0)
-    df['draft_type'] = df['draft_type'].fillna('Undrafted').replace({'':'Undrafted'})
-    df = df.rename(columns={'fantasypoints': 'FPoints', 'fantasyplayer': 'Draftee'})
-    return df
-    
-df = load_and_clean_data()
+# Hashing is cached on (mtime, size) so an unchanged file is never re-read; a touched but identical file keeps its hash
+@st.cache_data(show_spinner=False, max_entries=4)
+def dataset_version(path, mtime_ns, size):
+    return file_sha256(path)
+
+# Shared across sessions and keyed on the content hash, so reruns only reload after the scraper rewrites the master file.
+# The bundle is read-only, so cache_resource hands out the same object instead of copying it on every rerun
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_aggregates_bundle(version):
+    bundle = load_aggregates(version)
+    if bundle is None:
+        df = load_dataset(version)
+        bundle = build_aggregates(df, version, load_schedule(df['year'].max()))
+        # Kept for the next process; the bundle isn't committed, so the first load after a deploy builds it
+        try:
+            save_aggregates(bundle)
+        except OSError as e:
+            print(f"Could not save aggregates: {e}")
+    return bundle
+
+# The full dataset is only needed to re-score it, so it is loaded the first time someone tries a what-if rule set
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_master(version):
+    return load_dataset(version)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def what_if_standings(version, fp_weights):
+    return compare_rules(load_master(version), load_rules(overrides={'FP': dict(fp_weights)}))
+
+# Figures are built once per dataset version (and year) and shared by every session, so a rerun only re-sends them
+@st.cache_resource(show_spinner=False, max_entries=64)
+def year_figures(version, year):
+    cy_agg = load_aggregates_bundle(version)['years'][year]
+    fig_pie = px.pie(cy_agg['draft_share'], values='FPoints', names='draft_type', hole=0.4)
+    fig_pie.update_layout(margin=dict(l=0,r=0,t=20,b=0), height=180, showlegend=True, legend=dict(orientation="h", yanchor="bottom", y=-0.5, xanchor="center", x=0.5))
+    fig_bar = px.bar(cy_agg['countries'], x='FPoints', y='team', orientation='h', color='team', color_discrete_map=COUNTRY_COLORS)
+    fig_bar.update_layout(showlegend=False, margin=dict(l=0,r=0,t=0,b=0), height=230, xaxis_title=None, yaxis_title=None)
+    fig_bar.update_yaxes(tickmode='linear', tickfont=dict(size=10),automargin=True)
+    fig_line = px.line(cy_agg['timeline'], x='game_id', y='cum_pts', color='Draftee', markers=True)
+    fig_line.update_layout(height=250, margin=dict(l=0,r=0,t=20,b=0), xaxis_title="Game ID", yaxis_title="Points")
+    return fig_pie, fig_bar, fig_line
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def alltime_figures(version):
+    alltime_agg = load_aggregates_bundle(version)['alltime']
+    fig_all_countries = px.bar(alltime_agg['countries'], x='team', y='FPoints', color='team', color_discrete_map=COUNTRY_COLORS)
+    fig_all_countries.update_layout(showlegend=False, height=250, margin=dict(l=0,r=0,t=0,b=0), xaxis_title=None, yaxis_title=None)
+    fig_draft_bar = px.bar(alltime_agg['draft_year'], x='year', y='FPoints', color='draft_type', barmode='stack')
+    fig_draft_bar.update_layout(height=250, margin=dict(l=0,r=0,t=0,b=0), legend=dict(orientation="h", y=-0.3))
+    return fig_all_countries, fig_draft_bar
+
+# Panels are timed with WJ_METRICS set and each fragment is profiled with WJ_PROFILE set (see src/metrics.py)
+with stage('app.load_aggregates'):
+    master_stat = os.stat(MASTER_FILE)
+    version = dataset_version(MASTER_FILE, master_stat.st_mtime_ns, master_stat.st_size)
+    aggregates = load_aggregates_bundle(version)
 
 # Formatting Helper: 1 decimal for FPoints, 0 for the rest
 fmt_dict = {'FPoints': '{:.1f}', 'g': '{:.0f}', 'a': '{:.0f}', 'gwg': '{:.0f}'}
 
+# Each panel below is a fragment: its widgets rerun only that panel, not the whole script. The version is passed in
+# so a fragment keeps showing the dataset the rest of the page was drawn from until the next full rerun.
+@st.fragment
+def single_year_panel(version):
+    with profiled('app_single_year'):
+        aggregates = load_aggregates_bundle(version)
+        col1, col2, col3 = st.columns([1, 2,2])
+        # --- COLUMN 1: LEFT ---
+        with col1:
+            available_years = aggregates['available_years']
+        
+            # 'collapsed' visibility keeps the UI tight by removing the top label space
+            selected_year = st.selectbox(
+                "Select Year", 
+                options=available_years, 
+                index=0, 
+                key="cy_year_picker",
+                label_visibility="collapsed" 
+            )
+            cy_agg = aggregates['years'][selected_year]
+            with stage('app.year_figures'):
+                fig_pie, fig_bar, fig_line = year_figures(version, selected_year)
+
+            with stage('app.standings'):
+                st.markdown("### Standings")
+                standings = cy_agg['standings']
+                st.dataframe(standings.style.format({'FPoints': '{:.1f}'}).background_gradient(cmap='RdYlGn', subset=['FPoints']), 
+                             hide_index=True, use_container_width=True, height=180)
+
+            # Simulated with every data update (see src/projection.py), while the latest tournament has games left
+            projection = aggregates['projection']
+            if selected_year == available_years[0] and projection is not None:
+                with stage('app.projection'):
+                    st.markdown("### Projected Finish")
+                    places = projection.columns[3:].tolist()
+                    st.dataframe(projection.style.format({'FPoints': '{:.1f}', 'Projected': '{:.1f}', **{p: '{:.0%}' for p in places}})
+                                 .background_gradient(cmap='RdYlGn', subset=places, vmin=0, vmax=1),
+                                 hide_index=True, use_container_width=True, height=180)
+
+            with stage('app.draft_share'):
+                st.markdown("### % Drafted")
+                st.plotly_chart(fig_pie, use_container_width=True,height=120)
+
+            with stage('app.countries'):
+                st.markdown("### Countries")
+                st.plotly_chart(fig_bar, use_container_width=True,height=115)
+
+        # --- COLUMN 2: MIDDLE ---
+        with col2:
+            with stage('app.timeline'):
+                st.markdown("### Standings Over Time")
+                st.plotly_chart(fig_line, use_container_width=True)
+
+            with stage('app.top_players'):
+                st.markdown("### Top Players")
+                st.dataframe(cy_agg['best_tourney'].style.format(fmt_dict), height=250, use_container_width=True, hide_index=True,
+                             width = "content")
+
+        # --- COLUMN 3: RIGHT ---
+        with col3:
+            with stage('app.standings_detail'):
+                st.markdown("### Standings - Detail")
+                ordered_managers = standings['Draftee'].tolist()
+        
+                for i, manager in enumerate(ordered_managers):
+                    player_detail = cy_agg['player_detail'][manager]
+                    pts_val = standings.loc[standings['Draftee']==manager, 'FPoints'].values[0]
+                    is_expanded = (i == 0)
+                    leader_icon = "🏆 " if i == 0 else "👤 "
+                    with st.expander(f"{leader_icon}{manager} | {pts_val:.1f} pts", expanded=is_expanded):
+                        st.dataframe(player_detail.style.format(fmt_dict), use_container_width=True, hide_index=True,
+                                     width = "content")
+
+@st.fragment
+def alltime_summary(version):
+    with profiled('app_alltime_summary'):
+        alltime_agg = load_aggregates_bundle(version)['alltime']
+        with stage('app.alltime_figures'):
+            fig_all_countries, fig_draft_bar = alltime_figures(version)
+        with stage('app.yearly_pivot'):
+            st.markdown("### Performance by Year")
+            st.dataframe(alltime_agg['yearly_pivot'].style.format("{:.1f}").background_gradient(cmap='RdYlGn', axis=0), 
+                         hide_index=False, use_container_width=True, height=180)
+        with stage('app.countries_alltime'):
+            st.markdown("### Best Countries (All-Time)")
+            st.plotly_chart(fig_all_countries, use_container_width=True,height=130) 
+        with stage('app.draft_year'):
+            st.markdown("### Draft Type by Year")
+            st.plotly_chart(fig_draft_bar, use_container_width=True,height=150)
+        with stage('app.draft_efficiency'):
+            st.markdown("### Draft Efficiency")
+            st.dataframe(alltime_agg['draft_efficiency'].style.format("{:.0%}").background_gradient(cmap='RdYlGn', axis=None),
+                         hide_index=False, use_container_width=True, height=180)
+            with st.expander("Best Possible Drafts"):
+                st.caption("The initial draft with the most points each year: that year's position slots, at most "
+                           f"{MAX_PER_TEAM} players from one country.")
+                st.dataframe(alltime_agg['optimal_drafts'].style.format({'FPoints': '{:.1f}', 'year': '{:.0f}'}), hide_index=True,
+                             use_container_width=True, height=250)
+        with stage('app.what_if'):
+            with st.expander("Scoring What-If"):
+                weight_cols = st.columns(len(DEFAULT_RULES['FP']))
+                fp_weights = tuple((stat, weight_col.number_input(f"FP per {stat}", value=float(weight), step=0.25, key=f"whatif_{stat}"))
+                                   for weight_col, (stat, weight) in zip(weight_cols, DEFAULT_RULES['FP'].items()))
+                if dict(fp_weights) == DEFAULT_RULES['FP']:
+                    st.caption("Change a weight to re-score every tournament and see how the standings would have finished.")
+                else:
+                    what_if = what_if_standings(version, fp_weights)
+                    st.dataframe(what_if.style.format({'FPoints': '{:.1f}', 'FPoints_whatif': '{:.1f}'}), hide_index=True,
+                                 use_container_width=True, height=250)
+
+# Any change to the view, sort or filters starts the record book again from page 1
+def reset_records_page():
+    st.session_state.records_page = 1
+
+@st.fragment
+def record_book(version):
+    with profiled('app_record_book'):
+        alltime_agg = load_aggregates_bundle(version)['alltime']
+        with stage('app.record_book'):
+            view_type = st.radio("Select Record View",options=["Single Game", "Single Season", "Career"],horizontal=True,label_visibility="collapsed",
+                                 on_change=reset_records_page)
+            fmt_dict = {'FPoints': '{:.1f}', 'g': '{:.0f}', 'a': '{:.0f}', 'gwg': '{:.0f}','p':'{:.0f}','+/-':'{:.0f}','ts':'{:.0f}','gp':'{:.0f}','year':'{:.0f}',
+                        'sog':'{:.0f}','ga':'{:.0f}','svs':'{:.0f}','minutes':'{:.0f}','OGS':'{:.1f}','DGS':'{:.1f}','GGS':'{:.1f}','GS':'{:.1f}'}
+            st.markdown(f"### Record Book: {view_type}")
+            records = alltime_agg['records'][view_type]
+            filter_options = alltime_agg['record_filters'][view_type]
+
+            filter_cols = st.columns(len(RECORD_FILTERS[view_type]) + 1)
+            sort_by = filter_cols[0].selectbox("Sort by", options=RECORD_SORT_COLUMNS, key="records_sort", on_change=reset_records_page)
+            filters = {}
+            for filter_col, column in zip(filter_cols[1:], RECORD_FILTERS[view_type]):
+                choice = filter_col.selectbox(column.title(), options=["All"] + filter_options[column], key=f"records_{column}",
+                                              on_change=reset_records_page)
+                filters[column] = None if choice == "All" else choice
+
+            # Only the rows on the current page are ranked and styled, so the cost doesn't grow with the record book
+            rows = filter_records(records, filters)
+            n_pages = max(1, -(-len(rows) // RECORD_PAGE_SIZE))
+            page = st.number_input("Page", min_value=1, max_value=n_pages, step=1, key="records_page")
+            visible = page_records(records, rows, sort_by, page - 1, RECORD_PAGE_SIZE)
+            first_row = (page - 1) * RECORD_PAGE_SIZE
+            st.caption(f"Rows {min(first_row + 1, len(rows))}-{first_row + len(visible)} of {len(rows)} (page {page} of {n_pages})")
+            st.dataframe(visible.style.format(fmt_dict), height=500, use_container_width=True, hide_index=True,width = "content")
+
 # --- MAIN DASHBOARD ---
 tab_cy, tab_alltime = st.tabs([f"🏆 Single-Year Records", "📜 All-Time Records"])
 
 with tab_cy:
-    col1, col2, col3 = st.columns([1, 2,2])
-    # --- COLUMN 1: LEFT ---
-    with col1:
-        available_years = sorted(df['year'].unique(), reverse=True)
-        
-        # 'collapsed' visibility keeps the UI tight by removing the top label space
-        selected_year = st.selectbox(
-            "Select Year", 
-            options=available_years, 
-            index=0, 
-            key="cy_year_picker",
-            label_visibility="collapsed" 
-        )
-        cy_df = df[df['year'] == selected_year].copy()
-
-        st.markdown("### Standings")
-        standings = cy_df.groupby('Draftee')['FPoints'].sum().reset_index().sort_values('FPoints', ascending=False)
-        st.dataframe(standings.style.format({'FPoints': '{:.1f}'}).background_gradient(cmap='RdYlGn', subset=['FPoints']), 
-                     hide_index=True, use_container_width=True, height=180)
-
-        st.markdown("### % Drafted")
-        fig_pie = px.pie(cy_df, values='FPoints', names='draft_type', hole=0.4)
-        fig_pie.update_layout(margin=dict(l=0,r=0,t=20,b=0), height=180, showlegend=True, legend=dict(orientation="h", yanchor="bottom", y=-0.5, xanchor="center", x=0.5))
-        st.plotly_chart(fig_pie, use_container_width=True,height=120)
-
-        st.markdown("### Countries")
-        country_pts = cy_df.groupby('team')['FPoints'].sum().reset_index().sort_values('FPoints',ascending=False)
-        fig_bar = px.bar(country_pts, x='FPoints', y='team', orientation='h', color='team', color_discrete_map=COUNTRY_COLORS)
-        fig_bar.update_layout(showlegend=False, margin=dict(l=0,r=0,t=0,b=0), height=230, xaxis_title=None, yaxis_title=None)
-        fig_bar.update_yaxes(tickmode='linear', tickfont=dict(size=10),automargin=True)
-        st.plotly_chart(fig_bar, use_container_width=True,height=115)
-
-    # --- COLUMN 2: MIDDLE ---
-    with col2:
-        st.markdown("### Standings Over Time")
-        timeline = cy_df.groupby(['game_id', 'Draftee'])['FPoints'].sum().reset_index()
-        timeline = timeline.sort_values('game_id')
-        timeline['cum_pts'] = timeline.groupby('Draftee')['FPoints'].cumsum()
-        
-        fig_line = px.line(timeline, x='game_id', y='cum_pts', color='Draftee', markers=True)
-        fig_line.update_layout(height=250, margin=dict(l=0,r=0,t=20,b=0), xaxis_title="Game ID", yaxis_title="Points")
-        st.plotly_chart(fig_line, use_container_width=True)
-
-        st.markdown("### Top Players")
-        best_tourney = cy_df.fillna('Undrafted').groupby(['name','pos', 'team']).agg({'Draftee':'last',
-            'FPoints': 'sum', 'g': 'sum', 'a': 'sum', 'gwg': 'sum'
-        }).reset_index().sort_values('FPoints', ascending=False)
-        
-        st.dataframe(best_tourney.style.format(fmt_dict), height=250, use_container_width=True, hide_index=True,
-                     width = "content")
-
-    # --- COLUMN 3: RIGHT ---
-    with col3:
-        st.markdown("### Standings - Detail")
-        ordered_managers = standings['Draftee'].tolist()
-        
-        for i, manager in enumerate(ordered_managers):
-            manager_data = cy_df[cy_df['Draftee'] == manager]
-            player_detail = manager_data.groupby(['name','pos','team', 'draft_type']).agg({
-                'FPoints': 'sum', 'g': 'sum', 'a': 'sum', 'gwg': 'sum'
-            }).reset_index().sort_values('FPoints', ascending=False)
-            
-            pts_val = standings.loc[standings['Draftee']==manager, 'FPoints'].values[0]
-            is_expanded = (i == 0)
-            leader_icon = "🏆 " if i == 0 else "👤 "
-            with st.expander(f"{leader_icon}{manager} | {pts_val:.1f} pts", expanded=is_expanded):
-                st.dataframe(player_detail.style.format(fmt_dict), use_container_width=True, hide_index=True,
-                             width = "content")
+    single_year_panel(version)
 
 with tab_alltime:
     col_left, col_right = st.columns([0.4, 0.6])
     with col_left:
-        pd.set_option("styler.render.max_elements", 1000000)
-        st.markdown("### Performance by Year")
-        yearly_pivot = df[df['year'] >= 2019].pivot_table(index='Draftee', columns='year', values='FPoints', aggfunc='sum', fill_value=0)
-        yearly_pivot['Total'] = yearly_pivot.sum(axis=1)
-        yearly_pivot = yearly_pivot.sort_values('Total', ascending=False)
-        st.dataframe(yearly_pivot.style.format("{:.1f}").background_gradient(cmap='RdYlGn', axis=0), 
-                     hide_index=False, use_container_width=True, height=180)
-        st.markdown("### Best Countries (All-Time)")
-        all_time_countries = df.groupby('team')['FPoints'].sum().reset_index().sort_values('FPoints', ascending=False)
-        fig_all_countries = px.bar(all_time_countries, x='team', y='FPoints', color='team', color_discrete_map=COUNTRY_COLORS)
-        fig_all_countries.update_layout(showlegend=False, height=250, margin=dict(l=0,r=0,t=0,b=0), xaxis_title=None, yaxis_title=None)
-        st.plotly_chart(fig_all_countries, use_container_width=True,height=130) 
-        st.markdown("### Draft Type by Year")
-        draft_year = df[df['year'] >= 2019].groupby(['year', 'draft_type'])['FPoints'].sum().reset_index()
-        draft_year = draft_year.merge(draft_year.groupby('year').FPoints.sum().reset_index().rename(columns={'FPoints':'total'}))
-        draft_year['FPoints'] = draft_year['FPoints'] / draft_year['total']
-        fig_draft_bar = px.bar(draft_year, x='year', y='FPoints', color='draft_type', barmode='stack')
-        fig_draft_bar.update_layout(height=250, margin=dict(l=0,r=0,t=0,b=0), legend=dict(orientation="h", y=-0.3))
-        st.plotly_chart(fig_draft_bar, use_container_width=True,height=150)
+        alltime_summary(version)
     with col_right:
-        view_type = st.radio("Select Record View",options=["Single Game", "Single Season", "Career"],horizontal=True,label_visibility="collapsed")
-        fmt_dict = {'FPoints': '{:.1f}', 'g': '{:.0f}', 'a': '{:.0f}', 'gwg': '{:.0f}','p':'{:.0f}','+/-':'{:.0f}','ts':'{:.0f}','gp':'{:.0f}','year':'{:.0f}',
-                    'sog':'{:.0f}','ga':'{:.0f}','svs':'{:.0f}','minutes':'{:.0f}','OGS':'{:.1f}','DGS':'{:.1f}','GGS':'{:.1f}','GS':'{:.1f}'}
-        st.markdown(f"### Record Book: {view_type}")
-        if view_type == "Single Game":
-            records = df[~df.matchup.str.contains('all')].sort_values('FPoints', ascending=False)[['name','pos','team', 'year','matchup','FPoints',
-                                                                  'g','a','p','+/-','ts','sog','ga','svs','gwg','minutes','OGS','DGS','GGS','GS']]
-            st.dataframe(records.style.format(fmt_dict), height=500, use_container_width=True, hide_index=True,width = "content")
-        elif view_type == 'Single Season':
-            records = pd.concat(
-                (df[df.matchup.str.contains('all')].drop(columns=['matchup','game_id']),
-                 df[~df.matchup.str.contains('all')].groupby(['year','team','name','pos']).sum(numeric_only=True).reset_index().drop(columns='game_id')))[['name','pos','team', 'year','FPoints','gp',
-                                                                  'g','a','p','+/-','ts','sog','ga','svs','gwg','minutes','OGS','DGS','GGS','GS']].sort_values('FPoints', ascending=False)
-            st.dataframe(records.style.format(fmt_dict), height=500, use_container_width=True, hide_index=True,width = "content")
-        else:
-            records = df.groupby(['team','name','pos']).agg(
-                {'FPoints':'sum','year':'nunique','g':'sum','a':'sum','p':'sum','ts':'sum','+/-':'sum','sog':'sum','ga':'sum','svs':'sum','gwg':'sum','minutes':'sum',
-                 'OGS':'sum','GGS':'sum','DGS':'sum','GS':'sum'}).reset_index().sort_values('FPoints', ascending=False)
-            st.dataframe(records.style.format(fmt_dict), height=500, use_container_width=True, hide_index=True,width = "content")
\ No newline at end of file
+        record_book(version)
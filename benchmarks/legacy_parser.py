@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+from io import StringIO
+from bs4 import BeautifulSoup
+
+# The BeautifulSoup + read_html parsers the scraper used before game_parser, kept as they were as the reference that
+# parser_benchmark.py and tests/test_game_parser.py check game_parser's output and speed against.
+
+def extract_game_winners(soup):
+    game_summary_data = pd.read_html(StringIO(str(soup.find('div',{'class':'s-left-rail-fixed-content'}).find('div',{'class':'s-module-content'}))))[0]
+    game_summary_winner = game_summary_data[game_summary_data.TOT == game_summary_data.TOT.max()].teams.values[0]
+    game_summary_winning_goal = game_summary_data.TOT.min()+1
+    game_goal_scorers_data = (soup.find('div',{'class':'s-left-rail-fixed-content'}).find('div',{'class':'m-scoring'}).
+                              find_all('div',{'class':'s-player-name'}))
+    game_goal_scorers = []
+    for j in range(0,len(game_goal_scorers_data)):
+        temp = game_goal_scorers_data[j].text.strip()
+        game_goal_scorers.append(temp)
+    game_goal_scorers = pd.DataFrame(game_goal_scorers,columns=['name'])
+    return game_goal_scorers, game_summary_winner, game_summary_winning_goal
+
+def extract_game_lineups(soup):
+    game_lineup_home = []
+    game_lineup_data = soup.find('div',{'class':'s-team--home'}).find_all('span',{'class':'s-value'})
+    for k in range(0,len(game_lineup_data)): 
+        game_lineup_home.append(game_lineup_data[k].text)
+    game_lineup_home = pd.DataFrame(game_lineup_home,columns=['data'])
+    game_lineup_home['id'] = 1
+    game_lineup_home.id = game_lineup_home.id.cumsum() - 1
+    game_lineup_home['id2'] = np.round((game_lineup_home.id - 1) / 3,0)
+    game_lineup_home.id = game_lineup_home.id % 3
+    game_lineup_home = game_lineup_home.pivot(index='id2',columns='id',values='data')
+    game_lineup_home['key'] = 1
+    game_lineup_home.loc[game_lineup_home[2] == 'GK','Pos'] = 'GK'
+    game_lineup_home['Pos_ID'] = game_lineup_home.groupby(game_lineup_home[2]).key.cumsum()
+    game_lineup_home.loc[(game_lineup_home[2] == 'D') & (game_lineup_home.Pos_ID % 2 == 1),'Pos'] = 'LD'
+    game_lineup_home.loc[(game_lineup_home[2] == 'D') & (game_lineup_home.Pos_ID % 2 == 0),'Pos'] = 'RD'
+    game_lineup_home.loc[(game_lineup_home[2] == 'F') & (game_lineup_home.Pos_ID % 3 == 1),'Pos'] = 'LW'
+    game_lineup_home.loc[(game_lineup_home[2] == 'F') & (game_lineup_home.Pos_ID % 3 == 2),'Pos'] = 'C'
+    game_lineup_home.loc[(game_lineup_home[2] == 'F') & (game_lineup_home.Pos_ID % 3 == 0),'Pos'] = 'RW'
+    game_lineup_home.loc[(game_lineup_home[2] == 'D'),'Pos_ID'] = np.round((game_lineup_home.Pos_ID + 0.5) / 2,0)
+    game_lineup_home.loc[(game_lineup_home[2] == 'F'),'Pos_ID'] = np.round((game_lineup_home.Pos_ID + 0.67) / 3,0)
+    game_lineup_home = game_lineup_home.rename(columns={1:'name'}).drop(columns=[0,2,'key'])
+        
+    game_lineup_away = []
+    game_lineup_data = soup.find('div',{'class':'s-team--away'}).find_all('span',{'class':'s-value'})
+    for k in range(0,len(game_lineup_data)): 
+        game_lineup_away.append(game_lineup_data[k].text)   
+    game_lineup_away = pd.DataFrame(game_lineup_away,columns=['data'])
+    game_lineup_away['id'] = 1
+    game_lineup_away.id = game_lineup_away.id.cumsum() - 1
+    game_lineup_away['id2'] = np.round((game_lineup_away.id - 1) / 3,0)
+    game_lineup_away.id = game_lineup_away.id % 3
+    game_lineup_away = game_lineup_away.pivot(index='id2',columns='id',values='data')
+    game_lineup_away['key'] = 1
+    game_lineup_away.loc[game_lineup_away[2] == 'GK','Pos'] = 'GK'
+    game_lineup_away['Pos_ID'] = game_lineup_away.groupby(game_lineup_away[2]).key.cumsum()
+    game_lineup_away.loc[(game_lineup_away[2] == 'D') & (game_lineup_away.Pos_ID % 2 == 1),'Pos'] = 'LD'
+    game_lineup_away.loc[(game_lineup_away[2] == 'D') & (game_lineup_away.Pos_ID % 2 == 0),'Pos'] = 'RD'
+    game_lineup_away.loc[(game_lineup_away[2] == 'F') & (game_lineup_away.Pos_ID % 3 == 1),'Pos'] = 'LW'
+    game_lineup_away.loc[(game_lineup_away[2] == 'F') & (game_lineup_away.Pos_ID % 3 == 2),'Pos'] = 'C'
+    game_lineup_away.loc[(game_lineup_away[2] == 'F') & (game_lineup_away.Pos_ID % 3 == 0),'Pos'] = 'RW'
+    game_lineup_away.loc[(game_lineup_away[2] == 'D'),'Pos_ID'] = np.round((game_lineup_away.Pos_ID + 0.5) / 2,0)
+    game_lineup_away.loc[(game_lineup_away[2] == 'F'),'Pos_ID'] = np.round((game_lineup_away.Pos_ID + 0.67) / 3,0)
+    game_lineup_away = game_lineup_away.rename(columns={1:'name'}).drop(columns=[0,2,'key'])
+        
+    game_lineups = pd.concat((game_lineup_home,game_lineup_away))
+    return game_lineups
+
+def extract_game_stats(soup,url):
+    game_data = url.split('/')[-1].split('-')
+    game_data_year = url.split('/')[5]
+    game_data_team = [game_data[1],game_data[3]]
+    game_data_id = game_data[0]
+    game_statistics = pd.DataFrame()
+
+    for k in range(0,2):
+        game_statistics_tables = pd.read_html(StringIO(str(soup.find_all('div',{'class':'m-statistics-table'})[k])))
+        game_statistics_tables_skaters = pd.concat((game_statistics_tables[0],game_statistics_tables[1]),axis=1)
+        game_statistics_tables_goaltenders = pd.concat((game_statistics_tables[2],game_statistics_tables[3]),axis=1)
+        game_statistics_tables = pd.concat((game_statistics_tables_skaters,game_statistics_tables_goaltenders))
+        game_statistics_tables = game_statistics_tables[game_statistics_tables.columns
+                                                        [~game_statistics_tables.columns.str.contains('Unnamed')]]    
+        game_statistics_tables = game_statistics_tables.drop(columns=['avg','svs%'])
+        game_statistics_tables['game_id'] = game_data_id
+        game_statistics_tables['team'] = game_data_team[k]
+        game_statistics_tables['matchup'] = game_data[1]+'-'+game_data[3]
+        game_statistics_tables['year'] = game_data_year
+
+        game_statistics = pd.concat((game_statistics,game_statistics_tables))
+    return game_statistics
+
+# Both return (stats, goal scorers, winning team, winning goal number, line-ups) like game_parser_parse
+def legacy_parse(url, lineup, stats):
+    lineups_soup = BeautifulSoup(lineup, 'html.parser')
+    game_winners, gwgscorer, gwg = extract_game_winners(lineups_soup)
+    lineups = extract_game_lineups(lineups_soup)
+    stats_soup = BeautifulSoup(stats, 'html.parser')
+    stats = extract_game_stats(stats_soup, url.replace('playbyplay', 'statistics'))
+    return stats, game_winners, gwgscorer, gwg, lineups
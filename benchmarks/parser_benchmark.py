@@ -0,0 +1,81 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+import scraper
+from html_cache import HtmlCache
+from legacy_parser import legacy_parse
+from synthetic import TEAMS, game_pages
+
+# Times the BeautifulSoup + read_html parsers of legacy_parser.py against game_parser on the same pages and checks that
+# both produce the same per-game stat lines. Uses the recorded pages of the local HTML cache when there are any, else
+# synthetic pages; the summary says which. Run from the repository root: python benchmarks/parser_benchmark.py
+
+def cached_games(cache):
+    games = []
+    for url in sorted(cache.index):
+        if '/lineup/' in url:
+            statistics_url = url.replace('/lineup/', '/statistics/')
+            lineup, stats = cache.load(url), cache.load(statistics_url)
+            if lineup is not None and stats is not None:
+                games.append((url.replace('/lineup/', '/playbyplay/'), lineup, stats))
+    return games
+
+def synthetic_games(n):
+    return [game_pages(i, i + 1, TEAMS[i % len(TEAMS)], TEAMS[(i + 3) % len(TEAMS)]) for i in range(n)]
+
+# Returns (stats, goal scorers, winning team, winning goal number, line-ups) like legacy_parse; combine_game is shared
+# and not timed
+def game_parser_parse(url, lineup, stats):
+    game_winners, gwgscorer, gwg, lineups = scraper.parse_lineup_page(lineup)
+    stats = scraper.parse_statistics_page(stats, url.replace('playbyplay', 'statistics'))
+    return stats, game_winners, gwgscorer, gwg, lineups
+
+def time_call(fn, repeat, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        timings.append(time.perf_counter() - start)
+    return result, statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--games', type=int, default=20, help='synthetic games to generate when the cache is empty')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--synthetic', action='store_true', help='ignore the HTML cache')
+    parser.add_argument('--json', help='append the summary as a JSON line to this file')
+    args = parser.parse_args()
+
+    games = [] if args.synthetic else cached_games(HtmlCache())
+    source = 'cache'
+    if not games:
+        games, source = synthetic_games(args.games), 'synthetic'
+
+    legacy_times, new_times = [], []
+    for url, lineup, stats in games:
+        expected, legacy_time = time_call(legacy_parse, args.repeat, url, lineup, stats)
+        actual, new_time = time_call(game_parser_parse, args.repeat, url, lineup, stats)
+        expected, actual = scraper.combine_game(*expected), scraper.combine_game(*actual)
+        pd.testing.assert_frame_equal(expected.reset_index(drop=True), actual.reset_index(drop=True),
+                                      check_dtype=False, check_column_type=False, check_names=False)
+        legacy_times.append(legacy_time)
+        new_times.append(new_time)
+
+    summary = {'benchmark': 'parser', 'source': source, 'games': len(games),
+               'legacy_ms_per_game': 1000 * statistics.mean(legacy_times),
+               'game_parser_ms_per_game': 1000 * statistics.mean(new_times),
+               'speedup': sum(legacy_times) / sum(new_times)}
+    print(json.dumps(summary))
+    if args.json:
+        with open(args.json, 'a') as f:
+            f.write(json.dumps(summary) + '\n')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.join(REPO_DIR, 'src'))
+from synthetic import TEAMS, game_pages, write_data_tree
+
+# Times the pipeline and dashboard hot paths on a synthetic data tree of a chosen size and records one JSON line
+# per stage (seconds and tracemalloc peak) tagged with the commit, so results from two commits can be compared:
+#   python benchmarks/run_benchmarks.py --years 60 --managers 12 --games 40 --output bench.jsonl
+#   python benchmarks/run_benchmarks.py --compare base.jsonl bench.jsonl
+
+SCALES = {
+    'small': {'years': 10, 'managers': 4, 'games': 29},
+    'default': {'years': 27, 'managers': 4, 'games': 29},
+    'large': {'years': 80, 'managers': 16, 'games': 40},
+}
+REGRESSION_RATIO = 1.2
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def measure(fn, setup=None, repeat=3, memory=True):
+    # Best-of-n wall time with tracing off, then one traced run for the peak; setup restores state before every run
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    peak = None
+    if memory:
+        if setup:
+            setup()
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return min(timings), peak
+
+def stages(scale):
+    # Imported here because the pipeline modules resolve their data paths against the working directory
+    import scraper
+    import aggregates
+    import scoring
+    import projection
+    from datastore import BUILD_DIR, MASTER_FILE, file_sha256, load_dataset
+
+    pages = [game_pages(i, i + 1, TEAMS[i % len(TEAMS)], TEAMS[(i + 3) % len(TEAMS)]) for i in range(min(scale['games'], 20))]
+
+    def parse_games():
+        for url, lineup, stats in pages:
+            scraper.process_game(url, lineup, stats)
+
+    def clean_build():
+        shutil.rmtree(BUILD_DIR, ignore_errors=True)
+
+    def touch_one_game():
+        scraper.update_current_stats()
+        game_file = sorted(f for f in os.listdir(scraper.DYNAMIC_DIR) if f.endswith('.csv'))[-1]
+        with open(os.path.join(scraper.DYNAMIC_DIR, game_file), 'a') as f:
+            f.write('\n')
+
+    import pandas as pd
+    rosters = pd.read_csv(scraper.ROSTERS_FILE)
+    rosters = rosters.drop(columns=[c for c in rosters.columns if 'Unnamed' in c])
+    draft = pd.read_csv(scraper.DRAFT_FILE, index_col=False)
+    historical = pd.read_csv(scraper.HISTORICAL_FILE)
+    historical = historical.drop(columns=[c for c in historical.columns if 'Unnamed' in c])
+
+    def full_build():
+        clean_build()
+        scraper.update_current_stats()
+
+    yield 'parse_game_pages', parse_games, None
+    yield 'score_all_games', scraper.update_current_stats, clean_build
+    yield 'score_one_changed_game', scraper.update_current_stats, touch_one_game
+    yield 'join_static_historical', lambda: scraper.join_static(historical, rosters, draft), None
+    current = pd.read_parquet(scraper.CY_SCORED_FILE)
+    yield 'join_static_current', lambda: scraper.join_static(current, rosters, draft), None
+    yield 'transform_final_dataset', scraper.transform_final_dataset, full_build
+
+    df = load_dataset(file_sha256(MASTER_FILE))
+    yield 'load_dataset', lambda: load_dataset(file_sha256(MASTER_FILE)), None
+    yield 'rescore_all_years', lambda: scoring.score(df), None
+    # Projected from halfway through the current tournament, with the second half still to play
+    midway = df[(df['year'] < df['year'].max()) | (df['game_id'] <= scale['games'] // 2)]
+    yield 'project_standings', lambda: projection.project_standings(midway), None
+    cy_df = df[df['year'] == df['year'].max()]
+    yield 'panel_standings', lambda: aggregates.standings_table(cy_df), None
+    yield 'panel_timeline', lambda: aggregates.timeline_table(cy_df), None
+    yield 'panel_best_tourney', lambda: aggregates.best_tourney_table(cy_df), None
+    yield 'panel_player_detail', lambda: aggregates.player_detail_tables(cy_df), None
+    yield 'panel_yearly_pivot', lambda: aggregates.yearly_pivot_table(df), None
+    yield 'panel_countries_alltime', lambda: aggregates.country_table(df), None
+    yield 'panel_draft_year', lambda: aggregates.draft_year_table(df), None
+    season_records = aggregates.single_season_records(df)
+    yield 'panel_draft_efficiency', lambda: aggregates.draft_efficiency_tables(df, season_records), None
+    for view, build in aggregates.RECORD_VIEWS.items():
+        yield 'panel_records_' + view.lower().replace(' ', '_'), lambda build=build: build(df), None
+        records = build(df)
+        yield 'panel_records_page_' + view.lower().replace(' ', '_'), lambda records=records: aggregates.page_records(
+            records, aggregates.filter_records(records, {'team': records['team'].iloc[0]}), page=1), None
+    yield 'build_aggregates', lambda: aggregates.build_aggregates(df, None), None
+
+def run(scale, repeat, memory, output):
+    commit, started = git_commit(), datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+    workdir = tempfile.mkdtemp(prefix='wj_bench_')
+    cwd = os.getcwd()
+    try:
+        write_data_tree(workdir, **scale)
+        os.chdir(workdir)
+        results = []
+        for stage, fn, setup in stages(scale):
+            # The pipeline reports progress on stdout; keep stdout for the results
+            with contextlib.redirect_stdout(sys.stderr):
+                seconds, peak = measure(fn, setup, repeat, memory)
+            result = {'commit': commit, 'started': started, 'scale': scale, 'stage': stage, 'seconds': round(seconds, 6),
+                      'peak_mb': None if peak is None else round(peak / 2**20, 3)}
+            print(json.dumps(result), flush=True)
+            results.append(result)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    if output:
+        with open(output, 'a') as f:
+            f.writelines(json.dumps(r) + '\n' for r in results)
+    return results
+
+def load_results(path):
+    with open(path) as f:
+        results = [json.loads(line) for line in f if line.strip()]
+    # Latest result per (scale, stage)
+    return {(json.dumps(r['scale'], sort_keys=True), r['stage']): r for r in results}
+
+def compare(base_path, new_path):
+    base, new = load_results(base_path), load_results(new_path)
+    regressions = 0
+    print(f"{'stage':32} {'scale':40} {'base s':>9} {'new s':>9} {'ratio':>6} {'base MB':>8} {'new MB':>8}")
+    for key in sorted(base.keys() & new.keys()):
+        b, n = base[key], new[key]
+        ratio = n['seconds'] / b['seconds'] if b['seconds'] else float('inf')
+        flag = ' <-- slower' if ratio > REGRESSION_RATIO else ''
+        regressions += bool(flag)
+        print(f"{key[1]:32} {key[0]:40} {b['seconds']:9.4f} {n['seconds']:9.4f} {ratio:6.2f} {b['peak_mb'] or 0:8.1f} {n['peak_mb'] or 0:8.1f}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', choices=SCALES, default='default')
+    parser.add_argument('--years', type=int, help='historical tournaments to generate')
+    parser.add_argument('--managers', type=int, help='fantasy managers drafting each year')
+    parser.add_argument('--games', type=int, help='games in each tournament')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true', help='skip the traced run that measures peak memory')
+    parser.add_argument('--output', help='append results as JSON lines to this file')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'), help='compare two result files instead of running')
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare) else 0)
+    scale = dict(SCALES[args.scale], seed=args.seed)
+    scale.update({k: v for k, v in (('years', args.years), ('managers', args.managers), ('games', args.games)) if v is not None})
+    run(scale, args.repeat, not args.no_memory, args.output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Synthetic IIHF game pages with the same markup the parsers read: the scoring summary and goal scorers in the
+# left rail, both line-ups as (jersey, name, position) s-value triplets, and two m-statistics-table blocks of
+# four tables each (skater fixed/scroll columns, goalie fixed/scroll columns).
+
+BASE_URL = 'https://www.iihf.com/en/events/{year}/wm20/gamecenter/{page}/{game_id}-{home}-vs-{away}'
+SKATER_COLUMNS = ['g', 'a', 'p', 'pim', 'ts', '+/-', 'tot', 'shf']
+GOALIE_COLUMNS = ['sog', 'svs', 'ga', 'svs%', 'avg']
+
+def make_roster(rng, team, forwards=12, defence=7, goalies=2):
+    roster = []
+    for pos, n in (('GK', goalies), ('D', defence), ('F', forwards)):
+        for i in range(n):
+            roster.append((int(rng.integers(1, 99)), f"{team.upper()}{pos}{i} Player", pos))
+    return roster
+
+def html_table(header, rows):
+    head = ''.join(f'<th>{h}</th>' for h in header)
+    body = ''.join('<tr>' + ''.join(f'<td>{v}</td>' for v in row) + '</tr>' for row in rows)
+    return f'<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>'
+
+def lineup_page(home, away, home_roster, away_roster, score, scorers):
+    def team_div(cls, roster):
+        players = ''.join('<div class="s-lineup__player">' + ''.join(f'<span class="s-value">{v}</span>' for v in player) + '</div>'
+                          for player in roster)
+        return f'<div class="s-team {cls}">{players}</div>'
+    periods = lambda goals: [goals // 3 + (1 if i < goals % 3 else 0) for i in range(3)]
+    summary = html_table(['teams', '1', '2', '3', 'TOT'],
+                         [[team.upper()] + periods(goals) + [goals] for team, goals in zip((home, away), score)])
+    scoring = ''.join(f'<div class="s-goal"><div class="s-player-name"> {name} </div></div>' for name in scorers)
+    return ('<html><head><title>Lineup</title></head><body>'
+            f'<div class="s-left-rail-fixed-content"><div class="s-module-content">{summary}</div>'
+            f'<div class="m-scoring">{scoring}</div></div>'
+            f'{team_div("s-team--home", home_roster)}{team_div("s-team--away", away_roster)}</body></html>')
+
+def statistics_page(rng, rosters, points):
+    blocks = ''
+    for roster in rosters:
+        skaters = []
+        for jersey, name, pos in roster:
+            g, a = points.get(name, (0, 0))
+            toi = f"{int(rng.integers(5, 25))}:{int(rng.integers(0, 60)):02d}" if pos != 'GK' else ''
+            skaters.append([g, a, g + a, int(rng.integers(0, 3)) * 2, int(rng.integers(0, 5)), int(rng.integers(-2, 3)), toi,
+                            int(rng.integers(10, 30))])
+        goalies = [p for p in roster if p[2] == 'GK']
+        saves = []
+        for _ in goalies:
+            shots, against = int(rng.integers(20, 40)), int(rng.integers(0, 5))
+            saves.append([shots, shots - against, against, f"{(shots - against) / shots * 100:.2f}", f"{against:.2f}"])
+        fixed = lambda players: html_table(['', 'j#', 'name', 'pos'], [[''] + list(p) for p in players])
+        blocks += (f'<div class="m-statistics-table">{fixed(roster)}{html_table(SKATER_COLUMNS, skaters)}'
+                   f'{fixed(goalies)}{html_table(GOALIE_COLUMNS, saves)}</div>')
+    filters = ''.join('<div class="s-filter-item">Filter</div>' for _ in range(4))
+    return f'<html><head><title>Statistics</title></head><body><div class="m-gc-statistics">{filters}</div>{blocks}</body></html>'
+
+def game_pages(seed, game_id, home, away, year=2026):
+    # Returns (playbyplay url, lineup html, statistics html) for one finished game
+    rng = np.random.default_rng(seed)
+    home_roster, away_roster = make_roster(rng, home), make_roster(rng, away)
+    score = [int(rng.integers(0, 7)), int(rng.integers(0, 7))]
+    if score[0] == score[1]:
+        score[0] += 1
+    points, scorers = {}, []
+    for roster, goals in zip((home_roster, away_roster), score):
+        skaters = [p[1] for p in roster if p[2] != 'GK']
+        for _ in range(goals):
+            scorer, assist = skaters[int(rng.integers(len(skaters)))], skaters[int(rng.integers(len(skaters)))]
+            points[scorer] = (points.get(scorer, (0, 0))[0] + 1, points.get(scorer, (0, 0))[1])
+            points[assist] = (points.get(assist, (0, 0))[0], points.get(assist, (0, 0))[1] + 1)
+            scorers.append(scorer)
+    rng.shuffle(scorers)
+    url = BASE_URL.format(year=year, page='playbyplay', game_id=game_id, home=home, away=away)
+    return (url, lineup_page(home, away, home_roster, away_roster, score, scorers),
+            statistics_page(rng, [home_roster, away_roster], points))
+
+
+# Synthetic data trees in the schema of data/static/*.csv, DraftResults.txt and data/dynamic/Stats_CY/*.csv.
+# Players are named by team, position and a two-year cohort so careers span several tournaments like real ones.
+
+TEAMS = ['can', 'usa', 'swe', 'fin', 'cze', 'svk', 'sui', 'ger', 'lat', 'den']
+LINEUP = [('GK', 2), ('D', 8), ('F', 14)]
+SEASON_TOTAL_YEARS = 6
+
+def team_players(team, year):
+    players = []
+    for pos, n in LINEUP:
+        for i in range(n):
+            players.append((f"{team.upper()}{pos}{i} Cohort{(year + i) // 2}", pos, i + 2))
+    return players
+
+def game_frame(rng, game_id, home, away, year):
+    # One game's stat lines as run_pipeline writes them: skater rows for everyone, plus a second row per goalie
+    rows = []
+    for team in (home, away):
+        players = team_players(team, year)
+        n = len(players)
+        g = rng.poisson(0.25, n).astype(float)
+        a = rng.poisson(0.4, n).astype(float)
+        is_gk = np.array([p[1] == 'GK' for p in players])
+        g[is_gk], a[is_gk] = 0, 0
+        minutes = rng.integers(5, 25, n)
+        seconds = rng.integers(0, 60, n)
+        frame = pd.DataFrame({'j#': [p[2] for p in players], 'name': [p[0] for p in players], 'pos': [p[1] for p in players],
+                              'g': g, 'a': a, 'p': g + a, 'pim': rng.integers(0, 2, n) * 2.0, 'ts': rng.poisson(2, n).astype(float),
+                              '+/-': rng.integers(-2, 3, n).astype(float),
+                              'tot': np.where(is_gk, '0', [f"{m}:{s:02d}" for m, s in zip(minutes, seconds)]),
+                              'shf': rng.integers(10, 30, n).astype(float), 'sog': 0.0, 'ga': 0.0, 'svs': 0.0})
+        goalies = frame[is_gk].assign(g=0.0, a=0.0, p=0.0, pim=0.0, ts=0.0, shf=0.0, **{'+/-': 0.0})
+        shots = rng.integers(20, 40, len(goalies))
+        against = rng.integers(0, 5, len(goalies))
+        goalies = goalies.assign(sog=shots.astype(float), ga=against.astype(float), svs=(shots - against).astype(float))
+        frame = pd.concat((frame, goalies))
+        frame['game_id'] = game_id
+        frame['team'] = team
+        frame['matchup'] = f"{home}-{away}"
+        frame['year'] = year
+        rows.append(frame)
+    game = pd.concat(rows, ignore_index=True)
+    skaters = game[game.pos != 'GK']
+    game['gwg'] = 0.0
+    if skaters.g.sum():
+        game.loc[rng.choice(skaters.index[skaters.g > 0]), 'gwg'] = 1.0
+    game['Pos'] = np.where(game.pos == 'GK', 'GK', np.where(game.pos == 'D', 'LD', 'C'))
+    game['Pos_ID'] = 1
+    return game
+
+def schedule(rng, n_games):
+    return [tuple(rng.choice(TEAMS, 2, replace=False)) for _ in range(n_games)]
+
+def historical_frame(rng, years, games_per_year):
+    # Stats_Historical.csv: per-game rows, or one season-total 'all' row per player for the oldest years
+    frames = []
+    for year in years:
+        games = [game_frame(rng, game_id, home, away, year) for game_id, (home, away) in enumerate(schedule(rng, games_per_year), 1)]
+        season = pd.concat(games, ignore_index=True)
+        season = season[season.pos != 'GK'].drop(columns=['Pos', 'Pos_ID'])
+        season['minutes'] = season.tot.str.split(':').str[0].astype(int) + season.tot.str.split(':').str[1].astype(int) / 60
+        season = season.drop(columns=['tot', 'shf'])
+        season['gp'] = 1.0
+        if year < years[0] + SEASON_TOTAL_YEARS:
+            season = season.groupby(['name', 'pos', 'team', 'year'], as_index=False).agg(
+                {'j#': 'first', 'g': 'sum', 'a': 'sum', 'p': 'sum', 'pim': 'sum', 'ts': 'sum', '+/-': 'sum', 'sog': 'sum', 'ga': 'sum',
+                 'svs': 'sum', 'gwg': 'sum', 'minutes': 'sum', 'gp': 'sum'})
+            season['game_id'] = 1
+            season['matchup'] = season.team + '-all'
+        season['OGS'] = season.g * 0.75 + season.a * 0.625 + season.ts * 0.075
+        season['DGS'] = season['+/-'] * 0.15
+        season['GGS'] = season.svs * 0.1 - season.ga * 0.75
+        season['GS'] = season.OGS + season.DGS + season.GGS
+        season['FP'] = season.g * 1.5 + season.a + season.gwg * 3
+        frames.append(season)
+    columns = ['j#','name','pos','g','a','p','pim','ts','+/-','sog','ga','svs','game_id','team','matchup','year','gwg','minutes','gp',
+               'OGS','DGS','GGS','GS','FP']
+    return pd.concat(frames, ignore_index=True)[columns]
+
+def rosters_frame(rng, years):
+    rows = [(name, f"Club {i % 40}", team, year) for year in years for team in TEAMS for i, (name, _, _) in enumerate(team_players(team, year))]
+    rosters = pd.DataFrame(rows, columns=['name', 'club', 'team', 'year'])
+    n = len(rosters)
+    return rosters.assign(height=rng.normal(1.84, 0.05, n).round(2), weight=rng.integers(170, 220, n), age=rng.uniform(17.5, 20, n),
+                          tournament=1, NHL=0.0)
+
+def draft_frame(rng, years, managers):
+    # Every manager drafts four forwards and two defencemen before the tournament and two more players at game 25
+    rows = []
+    for year in years:
+        pool = [(name, pos) for team in TEAMS for name, pos, _ in team_players(team, year) if pos != 'GK']
+        picks = iter(rng.permutation(len(pool)))
+        for manager in range(managers):
+            needed = {'F': 4, 'D': 2}
+            for i in picks:
+                name, pos = pool[i]
+                if needed.get(pos, 0):
+                    needed[pos] -= 1
+                    rows.append((year, f"Manager{manager}", 0, name))
+                if not any(needed.values()):
+                    break
+            for _ in range(2):
+                rows.append((year, f"Manager{manager}", int(rng.choice([25, 26])), pool[next(picks)][0]))
+    return pd.DataFrame(rows, columns=['year', 'fantasyplayer', 'game_start', 'name'])
+
+def write_data_tree(root, years=27, managers=4, games=29, seed=0):
+    # Writes data/static and data/dynamic/Stats_CY under root for `years` historical tournaments plus a current one
+    rng = np.random.default_rng(seed)
+    current_year = 2026
+    historical_years = list(range(current_year - years, current_year))
+    static_dir = os.path.join(root, 'data', 'static')
+    games_dir = os.path.join(root, 'data', 'dynamic', 'Stats_CY')
+    os.makedirs(static_dir, exist_ok=True)
+    os.makedirs(games_dir, exist_ok=True)
+
+    historical_frame(rng, historical_years, games).to_csv(os.path.join(static_dir, 'Stats_Historical.csv'))
+    rosters_frame(rng, historical_years + [current_year]).to_csv(os.path.join(static_dir, 'Rosters_Full.csv'))
+    draft_frame(rng, [y for y in historical_years if y >= 2019] + [current_year], managers).to_csv(
+        os.path.join(static_dir, 'DraftResults.txt'), index=False)
+    for game_id, (home, away) in enumerate(schedule(rng, games), 1):
+        game_frame(rng, game_id, home, away, current_year).to_csv(os.path.join(games_dir, f"{game_id}-{home}-vs-{away}.csv"), index=False)
+
+
+# A recorded tournament for replaying through live.py's stand-in server
+SCHEDULE_URL = 'https://www.iihf.com/en/events/{year}/wm20/schedule'
+
+def schedule_page(urls):
+    links = ''.join(f'<a class="s-hover__link" target="_blank" href="{url.replace("https://www.iihf.com", "")}">Game</a>' for url in urls)
+    return f'<html><head><title>Schedule</title></head><body>{links}</body></html>'
+
+def record_tournament(cache, n_games, year=2026, seed=0):
+    # Stores a schedule and the line-up and statistics pages of n finished games in an HtmlCache, as a scraper run
+    # would have recorded them; returns the playbyplay urls in schedule order
+    urls = []
+    for i in range(n_games):
+        url, lineup, stats = game_pages(seed + i, i + 1, TEAMS[i % len(TEAMS)], TEAMS[(i + 3) % len(TEAMS)], year)
+        cache.store(url.replace('playbyplay', 'lineup'), lineup)
+        cache.store(url.replace('playbyplay', 'statistics'), stats)
+        urls.append(url)
+    cache.store(SCHEDULE_URL.format(year=year), schedule_page(urls))
+    cache.save()
+    return urls
@@ -0,0 +1,150 @@
+import os
+import numpy as np
+import pandas as pd
+from draft_analysis import draft_efficiency
+from projection import project_standings
+
+# PATH CONFIGURATION
+# A local build artifact (see .gitignore): a pickle is tied to the pandas that wrote it, so the file is rebuilt from the
+# master dataset wherever it's read instead of being committed
+AGGREGATES_FILE = 'data/dynamic/Aggregates.pkl'
+
+# Bump whenever the layout of the bundle changes so stale files are rebuilt instead of misread
+AGGREGATES_VERSION = 4
+
+DETAIL_AGG = {'FPoints': 'sum', 'g': 'sum', 'a': 'sum', 'gwg': 'sum'}
+GAME_RECORD_COLUMNS = ['name','pos','team', 'year','matchup','FPoints',
+                       'g','a','p','+/-','ts','sog','ga','svs','gwg','minutes','OGS','DGS','GGS','GS']
+SEASON_RECORD_COLUMNS = ['name','pos','team', 'year','FPoints','gp',
+                         'g','a','p','+/-','ts','sog','ga','svs','gwg','minutes','OGS','DGS','GGS','GS']
+CAREER_AGG = {'FPoints':'sum','year':'nunique','g':'sum','a':'sum','p':'sum','ts':'sum','+/-':'sum','sog':'sum','ga':'sum','svs':'sum','gwg':'sum','minutes':'sum',
+              'OGS':'sum','GGS':'sum','DGS':'sum','GS':'sum'}
+
+# RECORD BOOK PAGING
+RECORD_PAGE_SIZE = 50
+RECORD_SORT_COLUMNS = ['FPoints', 'g', 'a', 'p', '+/-', 'gwg', 'GS']
+# Career rows span several years ('year' holds the number of tournaments played), so they can't be filtered by year
+RECORD_FILTERS = {'Single Game': ['year', 'team', 'pos'], 'Single Season': ['year', 'team', 'pos'], 'Career': ['team', 'pos']}
+
+# One function per dashboard panel, so each can be rebuilt or benchmarked on its own
+
+def standings_table(cy_df):
+    return cy_df.groupby('Draftee', observed=True)['FPoints'].sum().reset_index().sort_values('FPoints', ascending=False)
+
+def draft_share_table(cy_df):
+    return cy_df.groupby('draft_type', observed=True)['FPoints'].sum().reset_index()
+
+def country_table(df):
+    return df.groupby('team', observed=True)['FPoints'].sum().reset_index().sort_values('FPoints', ascending=False)
+
+def timeline_table(cy_df):
+    timeline = cy_df.groupby(['game_id', 'Draftee'], observed=True)['FPoints'].sum().reset_index()
+    timeline = timeline.sort_values('game_id')
+    timeline['cum_pts'] = timeline.groupby('Draftee', observed=True)['FPoints'].cumsum()
+    return timeline
+
+def best_tourney_table(cy_df):
+    return cy_df.fillna('Undrafted').groupby(['name','pos', 'team'], observed=True).agg(
+        {'Draftee':'last', **DETAIL_AGG}).reset_index().sort_values('FPoints', ascending=False)
+
+def player_detail_tables(cy_df):
+    player_detail = {}
+    for manager, manager_data in cy_df.groupby('Draftee', observed=True):
+        player_detail[manager] = manager_data.groupby(['name','pos','team', 'draft_type'], observed=True).agg(
+            DETAIL_AGG).reset_index().sort_values('FPoints', ascending=False)
+    return player_detail
+
+def yearly_pivot_table(df):
+    yearly_pivot = df[df['year'] >= 2019].pivot_table(index='Draftee', columns='year', values='FPoints', aggfunc='sum', fill_value=0, observed=True)
+    yearly_pivot['Total'] = yearly_pivot.sum(axis=1)
+    return yearly_pivot.sort_values('Total', ascending=False)
+
+def draft_year_table(df):
+    draft_year = df[df['year'] >= 2019].groupby(['year', 'draft_type'], observed=True)['FPoints'].sum().reset_index()
+    draft_year = draft_year.merge(draft_year.groupby('year').FPoints.sum().reset_index().rename(columns={'FPoints':'total'}))
+    draft_year['FPoints'] = draft_year['FPoints'] / draft_year['total']
+    return draft_year
+
+def draft_efficiency_tables(df, season_records):
+    # Share of the best possible initial draft each manager got, per year, and the best drafts themselves
+    efficiency, optimal = draft_efficiency(df, season_records)
+    pivot = efficiency.pivot_table(index='Draftee', columns='year', values='Efficiency', observed=True)
+    pivot['Average'] = pivot.mean(axis=1)
+    return pivot.sort_values('Average', ascending=False), optimal
+
+def single_game_records(df):
+    return df.loc[~df.matchup.str.contains('all'), GAME_RECORD_COLUMNS].reset_index(drop=True)
+
+def single_season_records(df):
+    return pd.concat(
+        (df[df.matchup.str.contains('all')].drop(columns=['matchup','game_id']),
+         df[~df.matchup.str.contains('all')].groupby(['year','team','name','pos'], observed=True).sum(numeric_only=True).reset_index().drop(columns='game_id'))
+    )[SEASON_RECORD_COLUMNS].reset_index(drop=True)
+
+def career_records(df):
+    return df.groupby(['team','name','pos'], observed=True).agg(CAREER_AGG).reset_index()
+
+# Record tables are stored unsorted; page_records ranks only the rows a page needs
+RECORD_VIEWS = {'Single Game': single_game_records, 'Single Season': single_season_records, 'Career': career_records}
+
+def record_filter_options(records, columns):
+    return {column: sorted(records[column].dropna().unique().tolist()) for column in columns}
+
+def filter_records(records, filters=None):
+    # Positions of the rows matching every filter that is set ({column: value or None})
+    mask = np.ones(len(records), dtype=bool)
+    for column, value in (filters or {}).items():
+        if value is not None:
+            mask &= (records[column] == value).to_numpy()
+    return np.flatnonzero(mask)
+
+def page_records(records, rows, sort_by='FPoints', page=0, page_size=RECORD_PAGE_SIZE):
+    # Rows on the page in descending sort_by order, ties in row order so every row lands on exactly one page. The page's
+    # boundary value is found with a partition, so a page costs one pass over the matching rows plus a sort of the
+    # rows up to that value, however long the record book gets.
+    stop = min((page + 1) * page_size, len(rows))
+    start = min(page * page_size, stop)
+    if stop == 0:
+        return records.iloc[rows[:0]]
+    keys = -records[sort_by].to_numpy(dtype=float)[rows]
+    keys[np.isnan(keys)] = np.inf
+    # Every row tied with the boundary is a candidate, not just the ones the partition happened to put before it
+    boundary = np.partition(keys, stop - 1)[stop - 1]
+    candidates = np.flatnonzero(keys <= boundary)
+    top = candidates[np.argsort(keys[candidates], kind='stable')][start:stop]
+    return records.iloc[rows[top]]
+
+def build_year_aggregates(cy_df):
+    return {'standings': standings_table(cy_df), 'draft_share': draft_share_table(cy_df), 'countries': country_table(cy_df),
+            'timeline': timeline_table(cy_df), 'best_tourney': best_tourney_table(cy_df), 'player_detail': player_detail_tables(cy_df)}
+
+def build_alltime_aggregates(df):
+    records = {view: build(df) for view, build in RECORD_VIEWS.items()}
+    draft_efficiency, optimal_drafts = draft_efficiency_tables(df, records['Single Season'])
+    return {'yearly_pivot': yearly_pivot_table(df), 'countries': country_table(df), 'draft_year': draft_year_table(df),
+            'draft_efficiency': draft_efficiency, 'optimal_drafts': optimal_drafts,
+            'records': records, 'record_filters': {view: record_filter_options(records[view], RECORD_FILTERS[view]) for view in records}}
+
+def build_aggregates(df, source_digest, schedule=None):
+    # schedule is the latest tournament's game slugs (datastore.load_schedule), for the projection of its final standings
+    years = {year: build_year_aggregates(cy_df) for year, cy_df in df.groupby('year')}
+    return {'version': AGGREGATES_VERSION, 'source_sha256': source_digest,
+            'available_years': sorted(years, reverse=True), 'years': years, 'alltime': build_alltime_aggregates(df),
+            'projection': project_standings(df, schedule)}
+
+def save_aggregates(bundle, path=AGGREGATES_FILE):
+    tmp_path = path + '.tmp'
+    pd.to_pickle(bundle, tmp_path)
+    os.replace(tmp_path, path)
+
+def load_aggregates(source_digest, path=AGGREGATES_FILE):
+    if not os.path.exists(path):
+        return None
+    try:
+        bundle = pd.read_pickle(path)
+    except Exception as e:
+        print(f"Could not read aggregates {path}: {e}")
+        return None
+    if bundle.get('version') != AGGREGATES_VERSION or bundle.get('source_sha256') != source_digest:
+        return None
+    return bundle
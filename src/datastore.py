@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import pandas as pd
+
+# PATH CONFIGURATION
+MASTER_FILE = 'data/dynamic/Final_Master_Dataset.csv'
+SNAPSHOT_FILE = 'data/dynamic/Final_Master_Dataset.parquet'
+SCHEDULE_FILE = 'data/dynamic/Schedule_CY.json'
+
+# Low-cardinality string columns stored as categoricals in the snapshot
+CATEGORICAL_COLUMNS = ['team', 'pos', 'fantasyplayer', 'draft_type', 'matchup']
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def save_schedule(year, games, path=SCHEDULE_FILE):
+    # The current tournament's game slugs ('12-fin-vs-cze'), so the projection knows which games are still to come
+    with open(path + '.tmp', 'w') as f:
+        json.dump({'year': int(year), 'games': games}, f, indent=1)
+    os.replace(path + '.tmp', path)
+
+def load_schedule(year, path=SCHEDULE_FILE):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        schedule = json.load(f)
+    return schedule['games'] if schedule.get('year') == int(year) else None
+
+def write_snapshot(df, source_digest, path=SNAPSHOT_FILE):
+    # Typed columnar copy of the master CSV, tagged with the CSV's hash so readers can tell if it is stale
+    snapshot = df.reset_index(drop=True).copy()
+    for c in CATEGORICAL_COLUMNS:
+        if c in snapshot.columns:
+            snapshot[c] = snapshot[c].astype('category')
+    snapshot.attrs['source_sha256'] = source_digest
+    tmp_path = path + '.tmp'
+    snapshot.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+def read_snapshot(source_digest, path=SNAPSHOT_FILE):
+    if not os.path.exists(path):
+        return None
+    try:
+        snapshot = pd.read_parquet(path)
+    except Exception as e:
+        print(f"Could not read snapshot {path}: {e}")
+        return None
+    if snapshot.attrs.get('source_sha256') != source_digest:
+        return None
+    return snapshot
+
+def clean_dataset(df):
+    df['fantasypoints'] = df['FP'].fillna(0)
+    for c in ['fantasyplayer', 'draft_type']:
+        if isinstance(df[c].dtype, pd.CategoricalDtype) and 'Undrafted' not in df[c].cat.categories:
+            df[c] = df[c].cat.add_categories('Undrafted')
+    df['draft_type'] = df['draft_type'].fillna('Undrafted').replace({'':'Undrafted'})
+    df = df.rename(columns={'fantasypoints': 'FPoints', 'fantasyplayer': 'Draftee'})
+    return df
+
+def load_dataset(source_digest, path=MASTER_FILE):
+    df = read_snapshot(source_digest)
+    if df is None:
+        df = pd.read_csv(path)
+    return clean_dataset(df)
+
+# INCREMENTAL BUILD STATE
+BUILD_DIR = 'data/dynamic/build'
+MANIFEST_FILE = 'data/dynamic/build/manifest.json'
+CY_SCORED_FILE = 'data/dynamic/build/Stats_CY_Scored.parquet'
+HISTORICAL_JOINED_FILE = 'data/dynamic/build/Historical_Joined.parquet'
+
+def load_manifest(path=MANIFEST_FILE):
+    if not os.path.exists(path):
+        return {'games': {}, 'totals': {}, 'transform': {}}
+    with open(path) as f:
+        return json.load(f)
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+def write_parquet(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df.to_parquet(path + '.tmp', index=False)
+    os.replace(path + '.tmp', path)
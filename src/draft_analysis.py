@@ -0,0 +1,127 @@
+import argparse
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Hindsight check on the draft: for every year with draft results, the most points an initial draft could have
+# scored under the league's roster rules, and how much of that each manager's actual picks got. Run directly:
+#   python src/draft_analysis.py
+
+# ROSTER RULES
+# The position slots are read from each year's drafts (see roster_slots); the league has never had a country limit
+# written down, but no manager has drafted more than four players from one country
+MAX_PER_TEAM = 4
+
+def roster_slots(df):
+    # {year: {pos: slots}}: the position make-up most managers' initial picks had that year (2019 drafts were 3 F + 2 D)
+    picks = df[df['Draftee'].notna() & (df['draft_type'] == 'Initial')].drop_duplicates(['year', 'Draftee', 'name'])
+    counts = picks.groupby(['year', 'Draftee', 'pos'], observed=True).size().unstack(fill_value=0)
+    slots = {}
+    for year, managers in counts.groupby(level='year'):
+        make_up = managers.value_counts().index[0]
+        slots[year] = {pos: int(n) for pos, n in zip(managers.columns, make_up) if n > 0}
+    return slots
+
+def best_roster(points, teams, positions, slots, max_per_team=MAX_PER_TEAM):
+    # Row positions of the players with the most points that fill `slots` ({pos: count}) with at most max_per_team
+    # from one country. Position and country are two partition limits, so this is a min-cost flow:
+    # source -> country (capacity max_per_team) -> one arc per player (cost -points) -> position (capacity its slots)
+    # -> sink, solved by successive shortest paths. Only a country's best few players at a position can ever be
+    # picked, so the rest are dropped before the graph is built; a year is a graph of a few dozen arcs.
+    candidates = pd.DataFrame({'points': points, 'team': teams, 'pos': positions})
+    candidates = candidates[candidates['pos'].isin(list(slots))].sort_values('points', ascending=False, kind='stable')
+    candidates = candidates[candidates.groupby(['team', 'pos'], observed=True).cumcount()
+                            < np.minimum(candidates['pos'].map(slots).to_numpy(), max_per_team)]
+    team_nodes = {team: 1 + i for i, team in enumerate(candidates['team'].unique())}
+    pos_nodes = {pos: 1 + len(team_nodes) + i for i, pos in enumerate(slots)}
+    sink = 1 + len(team_nodes) + len(pos_nodes)
+
+    # Residual graph as parallel edge arrays; edge e ^ 1 is the reverse of edge e
+    head, cap, cost, out = [], [], [], [[] for _ in range(sink + 1)]
+    def add_edge(u, v, capacity, edge_cost):
+        for a, b, c, w in ((u, v, capacity, edge_cost), (v, u, 0, -edge_cost)):
+            out[a].append(len(head))
+            head.append(b)
+            cap.append(c)
+            cost.append(w)
+    for team, node in team_nodes.items():
+        add_edge(0, node, max_per_team, 0)
+    player_edges = {}
+    for row, player in candidates.iterrows():
+        player_edges[row] = len(head)
+        add_edge(team_nodes[player['team']], pos_nodes[player['pos']], 1, -float(player['points']))
+    for pos, node in pos_nodes.items():
+        add_edge(node, sink, slots[pos], 0)
+
+    for _ in range(sum(slots.values())):
+        # Bellman-Ford, as the player arcs have negative costs
+        distance = [np.inf] * (sink + 1)
+        via = [None] * (sink + 1)
+        distance[0] = 0
+        for _ in range(sink):
+            updated = False
+            for u in range(sink + 1):
+                if distance[u] == np.inf:
+                    continue
+                for e in out[u]:
+                    if cap[e] > 0 and distance[u] + cost[e] < distance[head[e]]:
+                        distance[head[e]] = distance[u] + cost[e]
+                        via[head[e]] = e
+                        updated = True
+            if not updated:
+                break
+        if via[sink] is None:
+            break
+        node = sink
+        while node != 0:
+            e = via[node]
+            cap[e] -= 1
+            cap[e ^ 1] += 1
+            node = head[e ^ 1]
+    return [row for row, e in player_edges.items() if cap[e] == 0]
+
+def optimal_drafts(season_totals, slots, max_per_team=MAX_PER_TEAM):
+    # The best possible initial draft of each year, from per-player season totals (aggregates.single_season_records)
+    rosters = []
+    for year, year_slots in slots.items():
+        season = season_totals[season_totals['year'] == year].reset_index(drop=True)
+        picked = best_roster(season['FPoints'].to_numpy(), season['team'].astype(str).to_numpy(),
+                             season['pos'].astype(str).to_numpy(), year_slots, max_per_team)
+        rosters.append(season.loc[picked, ['year', 'name', 'pos', 'team', 'FPoints']])
+    if not rosters:
+        return pd.DataFrame(columns=['year', 'name', 'pos', 'team', 'FPoints'])
+    return pd.concat(rosters, ignore_index=True).sort_values(['year', 'FPoints'], ascending=[False, False])
+
+def draft_efficiency(df, season_totals, max_per_team=MAX_PER_TEAM):
+    # Each manager's initial picks (their full-tournament points) against that year's best possible draft.
+    # Secondary picks join partway through, so they are left out on both sides.
+    slots = roster_slots(df)
+    optimal = optimal_drafts(season_totals, slots, max_per_team)
+    picks = df[df['Draftee'].notna() & (df['draft_type'] == 'Initial')]
+    picks = picks.groupby(['year', 'Draftee', 'name', 'team', 'pos'], observed=True)['FPoints'].sum().reset_index()
+    keys = ['year', 'name', 'team']
+    picks['Hit'] = pd.MultiIndex.from_frame(picks[keys].astype({'team': str})).isin(
+        pd.MultiIndex.from_frame(optimal[keys].astype({'team': str})))
+    table = picks.groupby(['year', 'Draftee'], observed=True).agg(FPoints=('FPoints', 'sum'), Hits=('Hit', 'sum')).reset_index()
+    table['Optimal'] = table['year'].map(optimal.groupby('year')['FPoints'].sum())
+    table['Efficiency'] = table['FPoints'] / table['Optimal']
+    return table, optimal
+
+def main():
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from datastore import MASTER_FILE, file_sha256, load_dataset
+    from aggregates import single_season_records
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--max-per-team', type=int, default=MAX_PER_TEAM, help='most players from one country on a roster')
+    args = parser.parse_args()
+
+    df = load_dataset(file_sha256(MASTER_FILE))
+    table, optimal = draft_efficiency(df, single_season_records(df), args.max_per_team)
+    print(optimal.to_string(index=False, float_format='{:.1f}'.format))
+    print()
+    print(table.to_string(index=False, float_format='{:.2f}'.format))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+import re
+import numpy as np
+import pandas as pd
+from lxml import html as lxml_html
+
+# Single-parse replacements for the BeautifulSoup + pd.read_html extract_* functions (now benchmarks/legacy_parser.py).
+# Each page is parsed once with lxml and every section is read straight off that tree, with no
+# re-serialisation and no second parse. Output frames match those functions column for column.
+
+ERROR_TITLE = "IIHF Error page"
+SITE_URL = 'https://www.iihf.com'
+DROPPED_STAT_COLUMNS = ['avg', 'svs%']
+
+# pd.read_html's defaults: these cells are missing values, and numbers may carry ',' thousands separators
+NA_VALUES = frozenset(['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN', '<NA>',
+                       'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'])
+INTEGER = re.compile(r'[+-]?\d+')
+
+def has_class(cls):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')"
+
+def parse_page(page):
+    return lxml_html.fromstring(page)
+
+def is_error_page(root):
+    title = root.find('.//title')
+    return title is not None and title.text_content() == ERROR_TITLE
+
+def cell_text(cell):
+    return cell.text_content().strip()
+
+def table_cell_text(cell):
+    # read_html collapses every run of whitespace inside a cell to one space
+    return ' '.join(cell.text_content().split())
+
+def expand_rows(trs):
+    # Cell texts per row, with colspan repeated across and rowspan carried down, as read_html expands them
+    rows, carried = [], {}
+    for tr in trs:
+        cells = [c for c in tr if c.tag in ('th', 'td')]
+        if not cells and not carried:
+            continue
+        active, carried, row = carried, {}, []
+        def take_carried():
+            while len(row) in active:
+                remaining, text = active.pop(len(row))
+                if remaining > 1:
+                    carried[len(row)] = (remaining - 1, text)
+                row.append(text)
+        for cell in cells:
+            take_carried()
+            text = table_cell_text(cell)
+            rowspan = int(cell.get('rowspan') or 1)
+            for _ in range(int(cell.get('colspan') or 1)):
+                if rowspan > 1:
+                    carried[len(row)] = (rowspan - 1, text)
+                row.append(text)
+        take_carried()
+        rows.append(row)
+    return rows
+
+def column_names(header, width):
+    # Empty names become 'Unnamed: n' and repeats get '.1', '.2'... suffixes, as read_html names them
+    names, seen = [], {}
+    for i in range(width):
+        name = header[i] if i < len(header) and header[i] else f"Unnamed: {i}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+def read_table(table):
+    # (column names, rows) with read_html's header rules: the <thead> rows, or else the leading rows made only of
+    # <th>, or else numbered columns. <tfoot> rows follow the body. Short rows are padded with empty cells.
+    head = [tr for section in table.findall('thead') for tr in section.iter('tr')]
+    foot = [tr for section in table.findall('tfoot') for tr in section.iter('tr')]
+    outside_body = set(head) | set(foot)
+    body = [tr for tr in table.iter('tr') if tr not in outside_body]
+    if not head:
+        for tr in body:
+            cells = [c for c in tr if c.tag in ('th', 'td')]
+            if not cells or any(c.tag != 'th' for c in cells):
+                break
+            head.append(tr)
+        body = body[len(head):]
+    header_rows = expand_rows(head)
+    rows = expand_rows(body + foot)
+    width = max([len(r) for r in header_rows + rows] or [0])
+    rows = [r + [''] * (width - len(r)) for r in rows]
+    if not header_rows:
+        return list(range(width)), rows
+    # A header of several rows would be a MultiIndex in read_html; the pages only ever have one, so the last is used
+    return column_names(header_rows[-1], width), rows
+
+def to_array(values):
+    # Missing values become NaN and all-numeric columns become numbers, as pd.read_html would leave them
+    present = [v for v in values if v not in NA_VALUES]
+    try:
+        numbers = np.array([float(v.replace(',', '')) if v not in NA_VALUES else np.nan for v in values], dtype=float)
+    except ValueError:
+        return np.array([np.nan if v in NA_VALUES else v for v in values], dtype=object)
+    if len(present) == len(values) and all(INTEGER.fullmatch(v.replace(',', '')) for v in values):
+        return numbers.astype(np.int64)
+    return numbers
+
+def to_frame(columns):
+    return pd.DataFrame({name: to_array(values) for name, values in columns.items()})
+
+def parse_schedule(page, base_url=SITE_URL):
+    root = parse_page(page)
+    links = root.xpath(f"//a[{has_class('s-hover__link')} and @target='_blank']/@href")
+    return [base_url + href for href in links]
+
+def assign_positions(values):
+    # values: flat list of (jersey, name, position code) triplets in line-up order
+    lineup = np.array(values, dtype=object).reshape(-1, 3)
+    codes = lineup[:, 2].astype(str)
+    pos_id = np.zeros(len(codes), dtype=np.int64)
+    for code in np.unique(codes):
+        mask = codes == code
+        pos_id[mask] = np.arange(1, mask.sum() + 1)
+
+    is_d, is_f = codes == 'D', codes == 'F'
+    pos = np.full(len(codes), np.nan, dtype=object)
+    pos[codes == 'GK'] = 'GK'
+    pos[is_d] = np.where(pos_id[is_d] % 2 == 1, 'LD', 'RD')
+    pos[is_f] = np.array(['RW', 'LW', 'C'], dtype=object)[pos_id[is_f] % 3]
+
+    line = pos_id.astype(float)
+    line[is_d] = np.round((pos_id[is_d] + 0.5) / 2, 0)
+    line[is_f] = np.round((pos_id[is_f] + 0.67) / 3, 0)
+    return pd.DataFrame({'name': lineup[:, 1], 'Pos': pos, 'Pos_ID': line.astype(np.int64)})
+
+def parse_lineup_page(page):
+    # Returns (goal scorers, winning team, winning goal number, line-ups), or None for an error page
+    root = parse_page(page)
+    if is_error_page(root):
+        return None
+    rail = root.xpath(f"//div[{has_class('s-left-rail-fixed-content')}]")[0]
+
+    summary = rail.xpath(f".//div[{has_class('s-module-content')}]")[0].find('.//table')
+    header, rows = read_table(summary)
+    summary = to_frame(dict(zip(header, zip(*rows))))
+    winner = summary[summary.TOT == summary.TOT.max()].teams.values[0]
+    winning_goal = summary.TOT.min()+1
+
+    scorers = rail.xpath(f".//div[{has_class('m-scoring')}]")[0].xpath(f".//div[{has_class('s-player-name')}]")
+    goal_scorers = pd.DataFrame([cell_text(s) for s in scorers], columns=['name'])
+
+    lineups = []
+    for side in ('s-team--home', 's-team--away'):
+        team = root.xpath(f"//div[{has_class(side)}]")[0]
+        lineups.append(assign_positions([s.text_content() for s in team.xpath(f".//span[{has_class('s-value')}]")]))
+    return goal_scorers, winner, winning_goal, pd.concat(lineups)
+
+def is_final(root):
+    filters = root.xpath(f"//div[{has_class('m-gc-statistics')}]")
+    return bool(filters) and len(filters[0].xpath(f".//div[{has_class('s-filter-item')}]")) >= 4
+
+def parse_statistics_page(page, url):
+    # Returns both teams' skater and goalie lines, or None until the game's statistics are final
+    root = parse_page(page)
+    if is_error_page(root) or not is_final(root):
+        return None
+    game_data = url.split('/')[-1].split('-')
+    game_data_year = url.split('/')[5]
+    game_data_team = [game_data[1],game_data[3]]
+
+    columns, n_rows = {}, 0
+    teams = []
+    for k, block in enumerate(root.xpath(f"//div[{has_class('m-statistics-table')}]")[:2]):
+        tables = [read_table(t) for t in block.iter('table')]
+        for fixed, scroll in ((tables[0], tables[1]), (tables[2], tables[3])):
+            # Side by side like pd.concat(axis=1): a table with fewer rows is padded with missing values
+            header = fixed[0] + scroll[0]
+            n = max(len(fixed[1]), len(scroll[1]))
+            rows = [a + b for a, b in zip(*(table[1] + [[''] * len(table[0])] * (n - len(table[1])) for table in (fixed, scroll)))]
+            for i, name in enumerate(header):
+                if str(name).startswith('Unnamed: ') or name in DROPPED_STAT_COLUMNS:
+                    continue
+                values = columns.setdefault(name, [''] * n_rows)
+                values.extend(row[i] for row in rows)
+            n_rows += len(rows)
+            teams += [game_data_team[k]] * len(rows)
+            for values in columns.values():
+                values.extend([''] * (n_rows - len(values)))
+
+    stats = to_frame(columns)
+    stats['game_id'] = game_data[0]
+    stats['team'] = teams
+    stats['matchup'] = game_data[1]+'-'+game_data[3]
+    stats['year'] = game_data_year
+    return stats
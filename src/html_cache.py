@@ -0,0 +1,79 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from collections import Counter
+
+# PATH CONFIGURATION
+CACHE_DIR = 'data/cache/html'
+
+# RETENTION POLICY
+CACHE_MAX_AGE_DAYS = 730
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+class HtmlCache:
+    # Content-addressed store of raw pages: gzip blobs named by their SHA-256, plus a url -> blob index.
+    # Pages that render identically (e.g. every IIHF error page) share one blob.
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self.index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+
+    def object_path(self, digest):
+        return os.path.join(self.cache_dir, 'objects', digest[:2], digest + '.html.gz')
+
+    def store(self, url, html):
+        data = html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(gzip.compress(data))
+            os.replace(path + '.tmp', path)
+        self.index[url] = {'sha256': digest, 'fetched_at': time.time()}
+        return digest
+
+    def load(self, url):
+        entry = self.index.get(url)
+        if entry is None or not os.path.exists(self.object_path(entry['sha256'])):
+            return None
+        with open(self.object_path(entry['sha256']), 'rb') as f:
+            return gzip.decompress(f.read()).decode('utf-8')
+
+    def save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self.index_path + '.tmp', 'w') as f:
+            json.dump(self.index, f, indent=1, sort_keys=True)
+        os.replace(self.index_path + '.tmp', self.index_path)
+
+    def prune(self, max_age_days=CACHE_MAX_AGE_DAYS, max_bytes=CACHE_MAX_BYTES):
+        # Drop entries past the retention window, then the oldest fetches until the blobs fit the size budget
+        cutoff = time.time() - max_age_days * 86400
+        self.index = {url: entry for url, entry in self.index.items() if entry['fetched_at'] >= cutoff}
+
+        refs = Counter(entry['sha256'] for entry in self.index.values())
+        sizes = {digest: os.path.getsize(self.object_path(digest)) for digest in refs if os.path.exists(self.object_path(digest))}
+        total = sum(sizes.values())
+        for url, entry in sorted(self.index.items(), key=lambda item: item[1]['fetched_at']):
+            if total <= max_bytes:
+                break
+            del self.index[url]
+            refs[entry['sha256']] -= 1
+            if refs[entry['sha256']] == 0:
+                total -= sizes.pop(entry['sha256'], 0)
+
+        referenced = {entry['sha256'] for entry in self.index.values()}
+        objects_dir = os.path.join(self.cache_dir, 'objects')
+        removed = 0
+        if os.path.isdir(objects_dir):
+            for shard in os.listdir(objects_dir):
+                for name in os.listdir(os.path.join(objects_dir, shard)):
+                    if name.replace('.html.gz', '') not in referenced:
+                        os.remove(os.path.join(objects_dir, shard, name))
+                        removed += 1
+        return removed
@@ -0,0 +1,222 @@
+import argparse
+import asyncio
+import hashlib
+import os
+import subprocess
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from game_parser import SITE_URL, is_error_page, is_final, parse_page, parse_schedule
+from datastore import save_schedule
+from html_cache import CACHE_DIR, HtmlCache
+from metrics import stage
+from scraper import (DYNAMIC_DIR, SCHEDULE_READY, HttpPool, PagePool, game_page_requests, process_game, schedule_url,
+                     transform_final_dataset, update_current_stats, write_game)
+
+# Long-running replacement for the six-hourly scrape while the tournament is on. Only games that are not in DYNAMIC_DIR
+# yet are watched, a few at a time in schedule order; their pages are re-parsed only when they change, and a game is
+# scored and swapped into the master dataset as soon as its statistics are final.
+#   python src/live.py                                              # iihf.com through the browser pool
+#   python src/live.py --serve --release-every 60 --live-for 30     # stand-in site replaying the HTML cache
+#   python src/live.py --base-url http://127.0.0.1:8765 --fetcher http
+
+# POLLING CONFIGURATION
+CURRENT_YEAR = '2026'
+WATCH_WINDOW = 4            # up to four games are played at the same time
+LIVE_INTERVAL = 60          # seconds between polls while a watched game is under way or its pages keep changing
+IDLE_INTERVAL = 15 * 60     # the interval doubles up to this while nothing changes
+SCHEDULE_REFRESH = 60 * 60  # play-off games join the schedule as the bracket fills in
+
+# STAND-IN SERVER
+SERVE_PORT = 8765
+ERROR_PAGE = '<html><head><title>IIHF Error page</title></head><body></body></html>'
+
+def game_state(lineup, stats):
+    # 'scheduled' until the line-up page exists, 'live' until the statistics are final
+    if is_error_page(parse_page(lineup)):
+        return 'scheduled'
+    root = parse_page(stats)
+    return 'final' if not is_error_page(root) and is_final(root) else 'live'
+
+def completed_games():
+    return {f[:-len('.csv')] for f in os.listdir(DYNAMIC_DIR) if f.endswith('.csv')}
+
+class LiveUpdater:
+    def __init__(self, pool, cache, year=CURRENT_YEAR, base_url=SITE_URL, window=WATCH_WINDOW,
+                 live_interval=LIVE_INTERVAL, idle_interval=IDLE_INTERVAL, on_update=None):
+        self.pool = pool
+        self.cache = cache
+        self.year = year
+        self.base_url = base_url
+        self.window = window
+        self.live_interval = live_interval
+        self.idle_interval = idle_interval
+        self.on_update = on_update
+        self.schedule = []
+        self.schedule_checked = None
+        self.digests = {}
+        self.states = {}
+        self.unpublished = []
+        self.interval = live_interval
+
+    async def refresh_schedule(self):
+        page = await self.pool.fetch(schedule_url(self.year, self.base_url), SCHEDULE_READY)
+        self.schedule = [url for url in parse_schedule(page, self.base_url) if "playbyplay" in url]
+        save_schedule(self.year, [url.split('/')[-1] for url in self.schedule])
+        self.schedule_checked = time.monotonic()
+
+    def watch_list(self):
+        completed = completed_games()
+        return [url for url in self.schedule if url.split('/')[-1] not in completed][:self.window]
+
+    async def poll(self):
+        # One round over the watched games; returns the ones that finished and were written to DYNAMIC_DIR
+        if self.schedule_checked is None or time.monotonic() - self.schedule_checked > SCHEDULE_REFRESH or not self.watch_list():
+            await self.refresh_schedule()
+        watched = self.watch_list()
+        pages = await self.pool.fetch_all([request for url in watched for request in game_page_requests(url)])
+
+        finished, changed = [], False
+        for url in watched:
+            (lineup_url, _), (stats_url, _) = game_page_requests(url)
+            lineup, stats = pages[lineup_url], pages[stats_url]
+            if isinstance(lineup, Exception) or isinstance(stats, Exception):
+                print(f"Error fetching {url}: {lineup if isinstance(lineup, Exception) else stats}")
+                continue
+            digest = hashlib.sha256((lineup + stats).encode('utf-8')).hexdigest()
+            if digest == self.digests.get(url):
+                continue
+            changed = True
+            self.states[url] = game_state(lineup, stats)
+            if self.states[url] != 'final':
+                self.digests[url] = digest
+                continue
+            try:
+                write_game(url, process_game(url, lineup, stats))
+            except Exception as e:
+                # The digest isn't recorded, so the same pages are parsed again on the next poll
+                print(f"Error processing {url}: {e}")
+                continue
+            self.digests[url] = digest
+            self.cache.store(lineup_url, lineup)
+            self.cache.store(stats_url, stats)
+            finished.append(url)
+
+        live = any(self.states.get(url) == 'live' for url in watched)
+        self.interval = self.live_interval if finished or changed or live else min(self.interval * 2, self.idle_interval)
+        return finished
+
+    def publish(self, finished):
+        # Scores just the new games, rebuilds the master dataset (swapped in atomically) and runs the update hook
+        update_current_stats()
+        transform_final_dataset()
+        self.cache.save()
+        print(f"{time.strftime('%H:%M:%S')} Published {', '.join(url.split('/')[-1] for url in finished)}")
+        if self.on_update:
+            subprocess.run(self.on_update, shell=True, check=False)
+
+    async def run(self, max_seconds=None, once=False):
+        deadline = None if max_seconds is None else time.monotonic() + max_seconds
+        while True:
+            with stage('live_poll') as timer:
+                finished = await self.poll()
+                timer.count('finished', len(finished))
+            self.unpublished += finished
+            if self.unpublished:
+                with stage('live_publish', games=len(self.unpublished)):
+                    try:
+                        self.publish(self.unpublished)
+                        self.unpublished = []
+                    except Exception as e:
+                        # The game files stay in DYNAMIC_DIR, so the next poll publishes them again
+                        print(f"Error publishing {', '.join(url.split('/')[-1] for url in self.unpublished)}: {e}")
+            if once:
+                return
+            if not self.watch_list() and not self.unpublished:
+                print("Every game on the schedule is in.")
+                return
+            if deadline is not None and time.monotonic() + self.interval > deadline:
+                return
+            states = {url.split('/')[-1]: self.states.get(url, 'unknown') for url in self.watch_list()}
+            print(f"{time.strftime('%H:%M:%S')} Watching {states}; next poll in {self.interval}s")
+            await asyncio.sleep(self.interval)
+
+async def watch(args):
+    pool_class = HttpPool if args.fetcher == 'http' else PagePool
+    async with pool_class(size=2 * args.window) as pool:
+        updater = LiveUpdater(pool, HtmlCache(args.cache_dir), args.year, args.base_url.rstrip('/'), args.window,
+                              args.live_interval, args.idle_interval, args.on_update)
+        await updater.run(None if args.max_hours is None else args.max_hours * 3600, args.once)
+
+class RecordedSite:
+    # Stand-in for the IIHF site: serves pages from an HtmlCache under their original paths. With release_every set,
+    # games are played back on a timeline: the first `released` games are over when the server starts, and every
+    # release_every seconds another one starts, shows a line-up and unfinished statistics for live_for seconds,
+    # then goes final. Games that have not started get the IIHF error page.
+    def __init__(self, cache, release_every=None, released=0, live_for=0):
+        self.cache = cache
+        self.release_every = release_every
+        self.released = released
+        self.live_for = live_for
+        self.started = time.monotonic()
+
+    def game_state(self, game_id):
+        if self.release_every is None:
+            return 'final'
+        since_start = time.monotonic() - self.started - (game_id - 1 - self.released) * self.release_every
+        return 'scheduled' if since_start < 0 else 'live' if since_start < self.live_for else 'final'
+
+    def page(self, path):
+        content = self.cache.load(SITE_URL + path)
+        if content is None or '/gamecenter/' not in path:
+            return content
+        state = self.game_state(int(path.rstrip('/').split('/')[-1].split('-')[0]))
+        if state == 'scheduled':
+            return ERROR_PAGE
+        if state == 'live' and '/statistics/' in path:
+            return content.replace('s-filter-item', 's-filter-pending')
+        return content
+
+def serve(site, port=SERVE_PORT, host='127.0.0.1'):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            content = site.page(urlparse(self.path).path)
+            body = (ERROR_PAGE if content is None else content).encode('utf-8')
+            self.send_response(404 if content is None else 200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--year', default=CURRENT_YEAR)
+    parser.add_argument('--base-url', default=SITE_URL, help='site to poll, e.g. a stand-in server started with --serve')
+    parser.add_argument('--fetcher', choices=['browser', 'http'], default='browser',
+                        help='http reads pages that are already rendered, such as the stand-in server')
+    parser.add_argument('--window', type=int, default=WATCH_WINDOW, help='unfinished games to watch at once')
+    parser.add_argument('--live-interval', type=float, default=LIVE_INTERVAL)
+    parser.add_argument('--idle-interval', type=float, default=IDLE_INTERVAL)
+    parser.add_argument('--max-hours', type=float, help='stop after this long, e.g. to fit a CI job')
+    parser.add_argument('--once', action='store_true', help='poll once and exit')
+    parser.add_argument('--on-update', help='shell command to run after each dataset swap, e.g. to commit and push it')
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--serve', action='store_true', help='run the stand-in site instead of the poller')
+    parser.add_argument('--port', type=int, default=SERVE_PORT)
+    parser.add_argument('--release-every', type=float, help='seconds between game starts on the stand-in site')
+    parser.add_argument('--released', type=int, default=0, help='games already over when the stand-in site starts')
+    parser.add_argument('--live-for', type=float, default=0, help='seconds each stand-in game stays in progress')
+    args = parser.parse_args()
+
+    if args.serve:
+        server = serve(RecordedSite(HtmlCache(args.cache_dir), args.release_every, args.released, args.live_for), args.port)
+        print(f"Serving {args.cache_dir} on http://127.0.0.1:{args.port}")
+        server.serve_forever()
+    else:
+        asyncio.run(watch(args))
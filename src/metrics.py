@@ -0,0 +1,114 @@
+import argparse
+import cProfile
+import functools
+import json
+import os
+import socket
+import time
+import tracemalloc
+
+# Opt-in stage timing for the scraper and the app, switched on by environment variables when the process starts:
+#   WJ_METRICS=metrics.jsonl   one JSON line per stage: name, seconds, ok, plus any fields and counters it recorded
+#   WJ_PROFILE=profiles/       also dump a cProfile (.prof) and the top tracemalloc allocations for each profiled() block
+# With neither set, timed() hands back the function unchanged and stage()/profiled() return a shared no-op, so the
+# instrumented code pays one function call per stage. Summarise a metrics file with: python src/metrics.py metrics.jsonl
+
+METRICS_FILE = os.environ.get('WJ_METRICS')
+PROFILE_DIR = os.environ.get('WJ_PROFILE')
+RUN_ID = f"{socket.gethostname()}-{os.getpid()}-{int(time.time())}"
+TOP_ALLOCATIONS = 25
+
+def emit(record):
+    with open(METRICS_FILE, 'a') as f:
+        f.write(json.dumps(record, default=str) + '\n')
+
+class NullStage:
+    def count(self, counter, n=1):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_STAGE = NullStage()
+
+class Stage:
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+        self.counters = {}
+
+    def count(self, counter, n=1):
+        self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def __enter__(self):
+        self.started = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        emit({'run': RUN_ID, 'stage': self.name, 'started': self.started, 'seconds': time.perf_counter() - self.start,
+              'ok': exc_type is None, **self.fields, **self.counters})
+        return False
+
+class Profile:
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        self.path = os.path.join(PROFILE_DIR, f"{self.name}-{RUN_ID}-{time.perf_counter_ns()}")
+        self.tracing = not tracemalloc.is_tracing()
+        if self.tracing:
+            tracemalloc.start()
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.disable()
+        self.profiler.dump_stats(self.path + '.prof')
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        if self.tracing:
+            tracemalloc.stop()
+        with open(self.path + '.alloc.txt', 'w') as f:
+            f.write(f"peak traced memory: {peak / 2**20:.1f} MB\n")
+            f.writelines(f"{stat}\n" for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS])
+        return False
+
+def stage(name, **fields):
+    # Context manager timing one stage; .count() adds counters (rows, pages, bytes...) to its record
+    return NULL_STAGE if METRICS_FILE is None else Stage(name, fields)
+
+def profiled(name):
+    return NULL_STAGE if PROFILE_DIR is None else Profile(name)
+
+def timed(name=None):
+    # Decorator form of stage(); leaves the function untouched when metrics are off
+    def decorate(fn):
+        if METRICS_FILE is None:
+            return fn
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with Stage(name or fn.__name__, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def summarise(path):
+    stages = {}
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            stages.setdefault(record['stage'], []).append(record['seconds'])
+    print(f"{'stage':40} {'calls':>6} {'total s':>9} {'mean ms':>9} {'max ms':>9}")
+    for name, seconds in sorted(stages.items(), key=lambda item: -sum(item[1])):
+        print(f"{name:40} {len(seconds):6} {sum(seconds):9.3f} {1000 * sum(seconds) / len(seconds):9.2f} {1000 * max(seconds):9.2f}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('path', help='metrics file written with WJ_METRICS set')
+    summarise(parser.parse_args().path)
@@ -0,0 +1,162 @@
+import argparse
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from scoring import DEFAULT_RULES
+
+# Monte Carlo projection of how the current tournament's fantasy standings will finish. Every drafted player gets
+# per-game goal and assist rates and a share of his goals that win games, estimated from this tournament and his
+# earlier ones; each simulation plays out the remaining schedule by drawing his points for the games his team has
+# left, all simulations of a batch at once as NumPy arrays. Run directly to print the projection:
+#   python src/projection.py --simulations 100000 --workers 4
+
+N_SIMULATIONS = 20000
+BATCH_SIZE = 5000
+PRIOR_GAMES = 3         # a player's rates start from his position's average as if he had played this many games at it
+PRIOR_GOALS = 5         # likewise for the share of his goals that are game winners
+HISTORY_WEIGHT = 0.5    # a game from an earlier tournament counts half as much as one from this tournament
+RECENT_TOURNAMENTS = 5  # used to guess the number of games left when there is no schedule to go by
+PLAYER_KEYS = ['name', 'team', 'pos']
+GAME_SLUG = re.compile(r'(\d+)-(.*)')
+
+def ordinal(n):
+    return f"{n}{'th' if 10 <= n % 100 <= 20 else {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')}"
+
+def team_games(df):
+    # Games per team per tournament; 1999-2004 rows are season totals, so count a team's most-used player's games
+    player_games = df.assign(gp=df['gp'].fillna(1)).groupby(['year', 'team', 'name'], observed=True)['gp'].sum()
+    return player_games.groupby(['year', 'team'], observed=True).max()
+
+def remaining_schedule(cy_df, teams, schedule=None, history=None):
+    # Games left per team that are already set, plus the number of games whose teams aren't known yet. A scheduled
+    # game is skipped only once its leading game id has been played; one whose slug doesn't name two teams of this
+    # tournament (e.g. '22-qf1-vs-qf8', '24-tbd-vs-tbd') is a bracket place still to be decided. Without a schedule,
+    # the typical length of recent tournaments stands in for the whole remaining schedule.
+    played = set(cy_df['game_id'].unique().tolist())
+    fixed = np.zeros(len(teams), dtype=np.int64)
+    if schedule is None:
+        totals = team_games(history).groupby('year').sum() / 2
+        return fixed, max(0, int(totals.tail(RECENT_TOURNAMENTS).median()) - len(played))
+    undecided = 0
+    team_index = {team: i for i, team in enumerate(teams)}
+    for slug in schedule:
+        match = GAME_SLUG.fullmatch(slug)
+        if match is not None and int(match.group(1)) in played:
+            continue
+        codes = match.group(2).split('-vs-') if match is not None else []
+        if len(codes) == 2 and all(code in team_index for code in codes):
+            for code in codes:
+                fixed[team_index[code]] += 1
+        else:
+            undecided += 1
+    return fixed, undecided
+
+def player_rates(df, year):
+    # Shrunk per-game rates for each drafted player of `year`: his games this year, earlier tournaments at
+    # HISTORY_WEIGHT, and PRIOR_GAMES at his position's average over every tournament
+    df = df.assign(gp=df['gp'].fillna(1))
+    cy_df = df[df['year'] == year]
+    drafted = cy_df[cy_df['Draftee'].notna() & (cy_df['Draftee'] != 'Undrafted')]
+    players = drafted.groupby(PLAYER_KEYS, observed=True).agg(
+        Draftee=('Draftee', 'last'), g=('g', 'sum'), a=('a', 'sum'), gwg=('gwg', 'sum'), gp=('gp', 'sum')).reset_index()
+    earlier = df[df['year'] < year].groupby(['name', 'team'], observed=True)[['g', 'a', 'gwg', 'gp']].sum()
+    earlier = earlier.reindex(pd.MultiIndex.from_frame(players[['name', 'team']])).fillna(0).to_numpy() * HISTORY_WEIGHT
+    by_position = df.groupby('pos', observed=True)[['g', 'a', 'gwg', 'gp']].sum()
+    prior = by_position.reindex(players['pos']).fillna(0).to_numpy()
+
+    g, a, gwg, gp = (players[['g', 'a', 'gwg', 'gp']].to_numpy(dtype=float) + earlier).T
+    prior_g, prior_a, prior_gwg, prior_gp = prior.T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        players['goal_rate'] = (g + PRIOR_GAMES * np.nan_to_num(prior_g / prior_gp)) / (gp + PRIOR_GAMES)
+        players['assist_rate'] = (a + PRIOR_GAMES * np.nan_to_num(prior_a / prior_gp)) / (gp + PRIOR_GAMES)
+        players['gwg_share'] = (gwg + PRIOR_GOALS * np.nan_to_num(prior_gwg / prior_g)) / (g + PRIOR_GOALS)
+    return players
+
+def build_model(df, schedule=None, rules=DEFAULT_RULES):
+    # Everything a batch of simulations needs, as plain arrays so it can be shipped to worker processes
+    year = df['year'].max()
+    cy_df = df[df['year'] == year]
+    players = player_rates(df, year)
+    teams = sorted(cy_df['team'].astype(str).unique())
+    fixed, undecided = remaining_schedule(cy_df, teams, schedule, df[df['year'] < year])
+    standings = cy_df.groupby('Draftee', observed=True)['FPoints'].sum()
+    standings = standings[standings.index != 'Undrafted']
+    managers = standings.index.astype(str).tolist()
+    owner = np.zeros((len(players), len(managers)))
+    owner[np.arange(len(players)), pd.Index(managers).get_indexer(players['Draftee'].astype(str))] = 1
+    return {'year': year, 'managers': managers, 'points': standings.to_numpy(dtype=float), 'owner': owner,
+            'team': pd.Index(teams).get_indexer(players['team'].astype(str)), 'n_teams': len(teams),
+            'fixed': fixed, 'undecided': undecided,
+            'goal_rate': players['goal_rate'].to_numpy(), 'assist_rate': players['assist_rate'].to_numpy(),
+            'gwg_share': players['gwg_share'].to_numpy(),
+            'weights': np.array([rules['FP'].get(stat, 0) for stat in ('g', 'a', 'gwg')], dtype=float)}
+
+def simulate(model, n, seed):
+    # n simulations of the rest of the tournament; returns finishing-place counts (manager x place) and point totals
+    rng = np.random.default_rng(seed)
+    games = np.broadcast_to(model['fixed'], (n, model['n_teams'])).copy()
+    if model['undecided']:
+        # Each undecided game goes to two different teams, drawn uniformly from every team of the tournament. Which
+        # teams are already out isn't in the data, so an eliminated team's players can still be drawn into a
+        # knockout game; this is a known limitation of the projection
+        picks = np.argpartition(rng.random((n, model['undecided'], model['n_teams'])), 2, axis=2)[..., :2]
+        games += (picks.reshape(n, -1)[..., None] == np.arange(model['n_teams'])).sum(axis=1)
+    player_games = games[:, model['team']]
+    goals = rng.poisson(player_games * model['goal_rate'])
+    assists = rng.poisson(player_games * model['assist_rate'])
+    winners = rng.binomial(goals, model['gwg_share'])
+    w_g, w_a, w_gwg = model['weights']
+    totals = model['points'] + (goals * w_g + assists * w_a + winners * w_gwg) @ model['owner']
+    # Ties are split at random rather than always going to the same manager
+    order = np.argsort(-(totals + rng.random(totals.shape) * 1e-6), axis=1)
+    n_managers = len(model['managers'])
+    places = np.stack([np.bincount(order[:, place], minlength=n_managers) for place in range(n_managers)], axis=1)
+    return places, totals.sum(axis=0)
+
+def project_standings(df, schedule=None, rules=DEFAULT_RULES, n_simulations=N_SIMULATIONS, workers=1, seed=0):
+    # Probability of each manager finishing in each place in the latest tournament, or None once it has no games left
+    model = build_model(df, schedule, rules)
+    if not model['fixed'].any() and not model['undecided'] or not model['managers']:
+        return None
+    sizes = [min(BATCH_SIZE, n_simulations - start) for start in range(0, n_simulations, BATCH_SIZE)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(simulate, [model] * len(sizes), sizes, seeds))
+    else:
+        results = [simulate(model, size, batch_seed) for size, batch_seed in zip(sizes, seeds)]
+    places = sum(result[0] for result in results) / n_simulations
+    table = pd.DataFrame(places, columns=[ordinal(place + 1) for place in range(places.shape[1])])
+    table.insert(0, 'Draftee', model['managers'])
+    table.insert(1, 'FPoints', model['points'])
+    table.insert(2, 'Projected', sum(result[1] for result in results) / n_simulations)
+    return table.sort_values('Projected', ascending=False).reset_index(drop=True)
+
+def main():
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from datastore import MASTER_FILE, file_sha256, load_dataset, load_schedule
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--simulations', type=int, default=N_SIMULATIONS)
+    parser.add_argument('--workers', type=int, default=1, help='processes to spread the batches over')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--through-game', type=int, help='project from the standings after this game, e.g. to check past calls')
+    parser.add_argument('--no-schedule', action='store_true', help='ignore the saved schedule and estimate the games left')
+    args = parser.parse_args()
+
+    df = load_dataset(file_sha256(MASTER_FILE))
+    latest = df['year'].max()
+    schedule = None if args.no_schedule else load_schedule(latest)
+    if args.through_game is not None:
+        df = df[(df['year'] < latest) | (df['game_id'] <= args.through_game)]
+    table = project_standings(df, schedule, n_simulations=args.simulations, workers=args.workers, seed=args.seed)
+    if table is None:
+        print("No games left to simulate.")
+    else:
+        print(table.to_string(index=False, float_format='{:.3f}'.format))
+
+if __name__ == '__main__':
+    main()
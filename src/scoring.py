@@ -0,0 +1,168 @@
+import argparse
+import copy
+import json
+import os
+import sys
+import numpy as np
+
+# Fantasy points and game scores as data instead of inline formulas. Every metric is a weighted sum of box-score
+# columns, so a rule set is a dict of weights; score() applies one to any number of games and years in one pass.
+# Run directly to see how a what-if rule set would have changed the standings:
+#   python src/scoring.py --rules my_rules.json
+#   python src/scoring.py --set OGS g 1 --points GS
+
+DEFAULT_RULES = {
+    'FP': {'g': 1.5, 'a': 1, 'gwg': 3},
+    'OGS': {'g': 0.75, 'a': 0.625, 'ts': 0.075},
+    'GGS': {'svs': 0.1, 'ga': -0.75},
+    # +/- plus shots suppressed relative to the tournament rate over the player's minutes, weighted by position
+    'DGS': {'+/-': 0.15, 'shot_suppression': 0.05, 'pos': {'D': 1.5, 'F': 0.75, 'GK': 0}},
+}
+
+# A team's shot rate is per game, so it is grouped per team-game within each tournament
+TEAM_GAME_KEYS = ['year', 'team', 'game_id']
+# Every metric score() adds, any of which the standings can be totalled on
+METRICS = ['FP', 'OGS', 'GGS', 'DGS', 'GS']
+
+def merge_weights(weights, layer, metric):
+    # Weights that are themselves a table (DGS 'pos') are merged key by key and can't be replaced by a number
+    for name, value in layer.items():
+        if isinstance(weights.get(name), dict):
+            if not isinstance(value, dict):
+                raise ValueError(f"{metric} {name!r} is a table of weights {weights[name]}; set one of its entries instead")
+            merge_weights(weights[name], value, f"{metric} {name}")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            weights[name] = value
+        else:
+            raise ValueError(f"{metric} {name!r} must be a number, got {value!r}")
+
+def load_rules(path=None, overrides=None):
+    # DEFAULT_RULES with the metrics from a JSON file (and/or a dict) laid over it; unlisted weights keep their default
+    rules = copy.deepcopy(DEFAULT_RULES)
+    layers = []
+    if path:
+        with open(path) as f:
+            layers.append(json.load(f))
+    if overrides:
+        layers.append(overrides)
+    for layer in layers:
+        for metric, weights in layer.items():
+            if metric not in rules:
+                raise ValueError(f"Unknown scoring metric {metric!r}; expected one of {sorted(rules)}")
+            merge_weights(rules[metric], weights, metric)
+    return rules
+
+def weighted_sum(df, weights):
+    columns = list(weights)
+    return df[columns].to_numpy(dtype=float) @ np.array([weights[c] for c in columns], dtype=float)
+
+def group_sums(codes, n_groups, *columns):
+    return [np.bincount(codes, weights=column, minlength=n_groups) for column in columns]
+
+def team_shot_rate(df):
+    # Team shots per 60 skater-minutes of each team-game, from one grouping instead of two groupby transforms
+    codes = df.groupby(TEAM_GAME_KEYS, sort=False, observed=True).ngroup().to_numpy()
+    sog, minutes = group_sums(codes, codes.max() + 1, df['sog'].to_numpy(dtype=float), df['minutes'].to_numpy(dtype=float))
+    return (sog / (minutes / 6))[codes]
+
+def tournament_shot_rate(df):
+    # Shots per team-minute across each whole tournament (both teams, 60 minutes, every game played so far)
+    years, codes = np.unique(df['year'].to_numpy(), return_inverse=True)
+    sog, = group_sums(codes, len(years), df['sog'].to_numpy(dtype=float))
+    max_game_id = np.zeros(len(years))
+    np.maximum.at(max_game_id, codes, df['game_id'].to_numpy(dtype=float))
+    return (sog / (max_game_id * 2 * 60))[codes]
+
+def stored_shot_suppression(df):
+    # The 1999-2004 rows are season totals (matchup '<team>-all', game_id 1), with no per-game shots to rebuild the
+    # tournament shot rate from. Their shots suppressed are taken back out of the DGS they were stored with, which
+    # was scored with DEFAULT_RULES; NaN on every other row, and everywhere if df has no stored DGS
+    if 'DGS' not in df or 'matchup' not in df:
+        return None
+    defaults = DEFAULT_RULES['DGS']
+    season_totals = df['matchup'].astype(str).str.endswith('-all').to_numpy()
+    position_weight = df['pos'].astype(str).map(defaults['pos']).fillna(1).to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        suppressed = ((df['DGS'].to_numpy(dtype=float) / position_weight - df['+/-'].to_numpy(dtype=float) * defaults['+/-'])
+                      / defaults['shot_suppression'])
+    # A goalie's DGS is always 0, so there is nothing to take back out of it
+    suppressed[season_totals & (position_weight == 0)] = 0
+    return np.where(season_totals, suppressed, np.nan)
+
+def defensive_game_score(df, total_spm, rules=DEFAULT_RULES, shots_suppressed=None):
+    # shots_suppressed, where it isn't NaN, stands in for the rate-based term (see stored_shot_suppression)
+    dgs_rules = rules['DGS']
+    suppressed = (total_spm - df['team_spma'].to_numpy(dtype=float)) * df['minutes'].to_numpy(dtype=float)
+    if shots_suppressed is not None:
+        suppressed = np.where(np.isnan(shots_suppressed), suppressed, shots_suppressed)
+    dgs = df['+/-'].to_numpy(dtype=float) * dgs_rules['+/-'] + suppressed * dgs_rules['shot_suppression']
+    position_weight = df['pos'].astype(str).map(dgs_rules['pos']).fillna(1).to_numpy(dtype=float)
+    return dgs * position_weight
+
+def score(df, rules=DEFAULT_RULES, total_spm=None):
+    # Scores every row of df with one rule set. The tournament shot rate is taken from df itself unless
+    # total_spm (a scalar, or one value per row) is supplied, e.g. from the running totals of an incremental build.
+    # Season-total rows keep the shots suppressed their stored DGS was scored with, as df holds no per-game shots for them.
+    scored = df.copy()
+    scored['FP'] = weighted_sum(scored, rules['FP'])
+    scored['team_spma'] = team_shot_rate(scored)
+    scored['OGS'] = weighted_sum(scored, rules['OGS'])
+    scored['GGS'] = weighted_sum(scored, rules['GGS'])
+    scored['DGS'] = defensive_game_score(scored, tournament_shot_rate(scored) if total_spm is None else total_spm, rules,
+                                         stored_shot_suppression(df))
+    scored['GS'] = scored['OGS'] + scored['DGS'] + scored['GGS']
+    return scored
+
+def standings(df, points='FP'):
+    return df.groupby(['year', 'Draftee'], observed=True)[points].sum().reset_index()
+
+def compare_rules(df, rules, baseline=DEFAULT_RULES, points='FP'):
+    # Each manager's points and finishing place per year under the baseline and the what-if rule set, with the
+    # standings totalled on `points` (FPoints for the league's fantasy points). Every row is scored before the
+    # undrafted ones are dropped, as the shot rates behind DGS are team and tournament rates.
+    if points not in METRICS:
+        raise ValueError(f"Unknown scoring metric {points!r}; expected one of {METRICS}")
+    column = 'FPoints' if points == 'FP' else points
+    drafted = lambda scored: scored[scored['Draftee'].notna() & (scored['Draftee'] != 'Undrafted')]
+    base = standings(drafted(score(df, baseline)), points).rename(columns={points: column})
+    what_if = standings(drafted(score(df, rules)), points).rename(columns={points: column + '_whatif'})
+    table = base.merge(what_if, on=['year', 'Draftee'], validate='1:1')
+    table['rank'] = table.groupby('year')[column].rank(ascending=False, method='min').astype(int)
+    table['rank_whatif'] = table.groupby('year')[column + '_whatif'].rank(ascending=False, method='min').astype(int)
+    return table.sort_values(['year', 'rank_whatif'], ascending=[False, True])
+
+def main():
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from datastore import MASTER_FILE, file_sha256, load_dataset
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rules', help='JSON file of weights to lay over DEFAULT_RULES')
+    parser.add_argument('--set', nargs=3, action='append', default=[], metavar=('METRIC', 'WEIGHT', 'VALUE'),
+                        help='override one weight, e.g. --set FP gwg 2 or --set DGS pos.D 2')
+    parser.add_argument('--points', choices=METRICS, default='FP', help='metric the standings are totalled on')
+    parser.add_argument('--changed-only', action='store_true', help='only list years where the finishing order changes')
+    args = parser.parse_args()
+
+    overrides = {}
+    for metric, weight, value in args.set:
+        *tables, weight = weight.split('.')
+        weights = overrides.setdefault(metric, {})
+        for name in tables:
+            weights = weights.setdefault(name, {})
+        weights[weight] = float(value)
+    try:
+        rules = load_rules(args.rules, overrides)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.points == 'FP' and any(metric != 'FP' for metric in overrides):
+        print(f"Note: the standings are totalled on FP, which --set {'/'.join(sorted(set(overrides) - {'FP'}))} doesn't change; "
+              "pick the metric with --points", file=sys.stderr)
+    table = compare_rules(load_dataset(file_sha256(MASTER_FILE)), rules, points=args.points)
+    if args.changed_only:
+        changed_years = table.loc[table['rank'] != table['rank_whatif'], 'year'].unique()
+        table = table[table['year'].isin(changed_years)]
+    print(json.dumps(rules, indent=1))
+    print(table.to_string(index=False, float_format='{:.1f}'.format))
+
+if __name__ == '__main__':
+    main()
@@ -1,214 +1,415 @@
 import pandas as pd
 import numpy as np
 import os
-import time
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
-from io import StringIO
+import argparse
+import asyncio
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from urllib.parse import urlparse
+from urllib.request import Request, urlopen
+from datastore import (MASTER_FILE, CY_SCORED_FILE, HISTORICAL_JOINED_FILE, file_sha256, write_snapshot, load_dataset,
+                       load_manifest, save_manifest, write_parquet, load_schedule, save_schedule, SCHEDULE_FILE)
+from aggregates import AGGREGATES_VERSION, build_aggregates, load_aggregates, save_aggregates
+from html_cache import HtmlCache
+from game_parser import SITE_URL, parse_schedule, parse_lineup_page, parse_statistics_page
+from metrics import profiled, stage, timed
+from scoring import DEFAULT_RULES, defensive_game_score, team_shot_rate, weighted_sum
 
 # PATH CONFIGURATION
 DYNAMIC_DIR = 'data/dynamic/Stats_CY'
-MASTER_FILE = 'data/dynamic/Final_Master_Dataset.csv'
+HISTORICAL_FILE = 'data/static/Stats_Historical.csv'
+ROSTERS_FILE = 'data/static/Rosters_Full.csv'
+DRAFT_FILE = 'data/static/DraftResults.txt'
 os.makedirs(DYNAMIC_DIR, exist_ok=True)
 
-def get_website(url):
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        )
-        page = context.new_page()
-        page.goto(url, wait_until="networkidle", timeout=60000)
-        time.sleep(3) 
-        content = page.content()
-        browser.close()
+# Bump when join_static or the layout of the master dataset changes, so the cached historical join and the master
+# are rebuilt even though none of their input files did
+TRANSFORM_VERSION = 1
+
+# JOIN KEYS
+ROSTER_KEYS = ['year', 'team', 'name']
+DRAFT_KEYS = ['year', 'name']
+
+# FETCH CONFIGURATION
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+POOL_SIZE = 4
+MAX_PER_HOST = 4
+READY_TIMEOUT = 20000
+GAME_BATCH = 4
+
+# Selectors each page type must render before its HTML is worth reading
+SCHEDULE_READY = 'a.s-hover__link'
+LINEUP_READY = 'div.s-team--home'
+STATISTICS_READY = 'div.m-statistics-table'
+
+# Error pages never render the selector, so stop waiting as soon as the title gives them away
+READY_SCRIPT = "sel => document.title === 'IIHF Error page' || document.querySelector(sel) !== null"
+
+class FetchPool:
+    # What the pools share: a subclass supplies fetch(url, ready_selector), and opens and closes whatever it fetches with
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def fetch_all(self, requests):
+        # requests: list of (url, ready_selector); failures come back as the exception instead of the HTML
+        requests = dict(requests)
+        contents = await asyncio.gather(*(self.fetch(url, sel) for url, sel in requests.items()), return_exceptions=True)
+        return dict(zip(requests, contents))
+
+class PagePool(FetchPool):
+    # One long-lived browser with a bounded pool of pages, shared by every fetch in a run
+    def __init__(self, size=POOL_SIZE, per_host=MAX_PER_HOST, cache=None):
+        self.size = size
+        self.per_host = per_host
+        self.cache = cache
+        self.host_limits = {}
+
+    async def __aenter__(self):
+        self.playwright = await async_playwright().start()
+        self.browser = await self.playwright.chromium.launch(headless=True)
+        self.context = await self.browser.new_context(user_agent=USER_AGENT)
+        self.pages = asyncio.Queue()
+        for _ in range(self.size):
+            self.pages.put_nowait(await self.context.new_page())
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.browser.close()
+        await self.playwright.stop()
+
+    async def fetch(self, url, ready_selector='body'):
+        host_limit = self.host_limits.setdefault(urlparse(url).netloc, asyncio.Semaphore(self.per_host))
+        async with host_limit:
+            page = await self.pages.get()
+            try:
+                with stage('fetch', pool='browser', url=url) as timer:
+                    await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+                    try:
+                        await page.wait_for_function(READY_SCRIPT, arg=ready_selector, timeout=READY_TIMEOUT)
+                    except PlaywrightTimeoutError:
+                        timer.count('ready_timeouts')
+                        print(f"Timed out waiting for {ready_selector} on {url}")
+                    content = await page.content()
+                    timer.count('bytes', len(content))
+                if self.cache is not None:
+                    self.cache.store(url, content)
+                return content
+            finally:
+                self.pages.put_nowait(page)
+
+class ReplayPool(FetchPool):
+    # Same interface as PagePool, but serves pages from the HTML cache and never touches the network
+    def __init__(self, cache):
+        self.cache = cache
+
+    async def fetch(self, url, ready_selector='body'):
+        with stage('fetch', pool='replay', url=url):
+            content = self.cache.load(url)
+        if content is None:
+            raise KeyError(f"{url} is not in the HTML cache")
         return content
 
-def extract_schedule_list(year):
-    schedule_url_list = []
-    soup_file = get_website('https://www.iihf.com/en/events/'+year+'/wm20/schedule')
-    soup = BeautifulSoup(soup_file,'html.parser')
-    temp_game_url = soup.find_all('a',{'class':'s-hover__link','target':'_blank'})
-    for j in range(0,len(temp_game_url)):
-        schedule_url_list.append('https://www.iihf.com'+temp_game_url[j]['href'])
-    return schedule_url_list
-
-def extract_game_winners(soup):
-    game_summary_data = pd.read_html(StringIO(str(soup.find('div',{'class':'s-left-rail-fixed-content'}).find('div',{'class':'s-module-content'}))))[0]
-    game_summary_winner = game_summary_data[game_summary_data.TOT == game_summary_data.TOT.max()].teams.values[0]
-    game_summary_winning_goal = game_summary_data.TOT.min()+1
-    game_goal_scorers_data = (soup.find('div',{'class':'s-left-rail-fixed-content'}).find('div',{'class':'m-scoring'}).
-                              find_all('div',{'class':'s-player-name'}))
-    game_goal_scorers = []
-    for j in range(0,len(game_goal_scorers_data)):
-        temp = game_goal_scorers_data[j].text.strip()
-        game_goal_scorers.append(temp)
-    game_goal_scorers = pd.DataFrame(game_goal_scorers,columns=['name'])
-    return game_goal_scorers, game_summary_winner, game_summary_winning_goal
-
-def extract_game_lineups(soup):
-    game_lineup_home = []
-    game_lineup_data = soup.find('div',{'class':'s-team--home'}).find_all('span',{'class':'s-value'})
-    for k in range(0,len(game_lineup_data)): 
-        game_lineup_home.append(game_lineup_data[k].text)
-    game_lineup_home = pd.DataFrame(game_lineup_home,columns=['data'])
-    game_lineup_home['id'] = 1
-    game_lineup_home.id = game_lineup_home.id.cumsum() - 1
-    game_lineup_home['id2'] = np.round((game_lineup_home.id - 1) / 3,0)
-    game_lineup_home.id = game_lineup_home.id % 3
-    game_lineup_home = game_lineup_home.pivot(index='id2',columns='id',values='data')
-    game_lineup_home['key'] = 1
-    game_lineup_home.loc[game_lineup_home[2] == 'GK','Pos'] = 'GK'
-    game_lineup_home['Pos_ID'] = game_lineup_home.groupby(game_lineup_home[2]).key.cumsum()
-    game_lineup_home.loc[(game_lineup_home[2] == 'D') & (game_lineup_home.Pos_ID % 2 == 1),'Pos'] = 'LD'
-    game_lineup_home.loc[(game_lineup_home[2] == 'D') & (game_lineup_home.Pos_ID % 2 == 0),'Pos'] = 'RD'
-    game_lineup_home.loc[(game_lineup_home[2] == 'F') & (game_lineup_home.Pos_ID % 3 == 1),'Pos'] = 'LW'
-    game_lineup_home.loc[(game_lineup_home[2] == 'F') & (game_lineup_home.Pos_ID % 3 == 2),'Pos'] = 'C'
-    game_lineup_home.loc[(game_lineup_home[2] == 'F') & (game_lineup_home.Pos_ID % 3 == 0),'Pos'] = 'RW'
-    game_lineup_home.loc[(game_lineup_home[2] == 'D'),'Pos_ID'] = np.round((game_lineup_home.Pos_ID + 0.5) / 2,0)
-    game_lineup_home.loc[(game_lineup_home[2] == 'F'),'Pos_ID'] = np.round((game_lineup_home.Pos_ID + 0.67) / 3,0)
-    game_lineup_home = game_lineup_home.rename(columns={1:'name'}).drop(columns=[0,2,'key'])
-        
-    game_lineup_away = []
-    game_lineup_data = soup.find('div',{'class':'s-team--away'}).find_all('span',{'class':'s-value'})
-    for k in range(0,len(game_lineup_data)): 
-        game_lineup_away.append(game_lineup_data[k].text)   
-    game_lineup_away = pd.DataFrame(game_lineup_away,columns=['data'])
-    game_lineup_away['id'] = 1
-    game_lineup_away.id = game_lineup_away.id.cumsum() - 1
-    game_lineup_away['id2'] = np.round((game_lineup_away.id - 1) / 3,0)
-    game_lineup_away.id = game_lineup_away.id % 3
-    game_lineup_away = game_lineup_away.pivot(index='id2',columns='id',values='data')
-    game_lineup_away['key'] = 1
-    game_lineup_away.loc[game_lineup_away[2] == 'GK','Pos'] = 'GK'
-    game_lineup_away['Pos_ID'] = game_lineup_away.groupby(game_lineup_away[2]).key.cumsum()
-    game_lineup_away.loc[(game_lineup_away[2] == 'D') & (game_lineup_away.Pos_ID % 2 == 1),'Pos'] = 'LD'
-    game_lineup_away.loc[(game_lineup_away[2] == 'D') & (game_lineup_away.Pos_ID % 2 == 0),'Pos'] = 'RD'
-    game_lineup_away.loc[(game_lineup_away[2] == 'F') & (game_lineup_away.Pos_ID % 3 == 1),'Pos'] = 'LW'
-    game_lineup_away.loc[(game_lineup_away[2] == 'F') & (game_lineup_away.Pos_ID % 3 == 2),'Pos'] = 'C'
-    game_lineup_away.loc[(game_lineup_away[2] == 'F') & (game_lineup_away.Pos_ID % 3 == 0),'Pos'] = 'RW'
-    game_lineup_away.loc[(game_lineup_away[2] == 'D'),'Pos_ID'] = np.round((game_lineup_away.Pos_ID + 0.5) / 2,0)
-    game_lineup_away.loc[(game_lineup_away[2] == 'F'),'Pos_ID'] = np.round((game_lineup_away.Pos_ID + 0.67) / 3,0)
-    game_lineup_away = game_lineup_away.rename(columns={1:'name'}).drop(columns=[0,2,'key'])
-        
-    game_lineups = pd.concat((game_lineup_home,game_lineup_away))
-    return game_lineups
-
-def extract_game_stats(soup,url):
-    game_data = url.split('/')[-1].split('-')
-    game_data_year = url.split('/')[5]
-    game_data_team = [game_data[1],game_data[3]]
-    game_data_id = game_data[0]
-    game_statistics = pd.DataFrame()
-
-    for k in range(0,2):
-        game_statistics_tables = pd.read_html(StringIO(str(soup.find_all('div',{'class':'m-statistics-table'})[k])))
-        game_statistics_tables_skaters = pd.concat((game_statistics_tables[0],game_statistics_tables[1]),axis=1)
-        game_statistics_tables_goaltenders = pd.concat((game_statistics_tables[2],game_statistics_tables[3]),axis=1)
-        game_statistics_tables = pd.concat((game_statistics_tables_skaters,game_statistics_tables_goaltenders))
-        game_statistics_tables = game_statistics_tables[game_statistics_tables.columns
-                                                        [~game_statistics_tables.columns.str.contains('Unnamed')]]    
-        game_statistics_tables = game_statistics_tables.drop(columns=['avg','svs%'])
-        game_statistics_tables['game_id'] = game_data_id
-        game_statistics_tables['team'] = game_data_team[k]
-        game_statistics_tables['matchup'] = game_data[1]+'-'+game_data[3]
-        game_statistics_tables['year'] = game_data_year
-
-        game_statistics = pd.concat((game_statistics,game_statistics_tables))
-    return game_statistics
-
-def run_pipeline():
+class HttpPool(FetchPool):
+    # Same interface as PagePool for servers that send finished HTML, such as live.py's stand-in for the IIHF site;
+    # plain requests in worker threads, no browser
+    def __init__(self, size=POOL_SIZE, cache=None, timeout=60):
+        self.size = size
+        self.cache = cache
+        self.timeout = timeout
+
+    async def __aenter__(self):
+        self.slots = asyncio.Semaphore(self.size)
+        return self
+
+    def get(self, url):
+        with urlopen(Request(url, headers={'User-Agent': USER_AGENT}), timeout=self.timeout) as response:
+            return response.read().decode('utf-8')
+
+    async def fetch(self, url, ready_selector='body'):
+        async with self.slots:
+            with stage('fetch', pool='http', url=url) as timer:
+                content = await asyncio.to_thread(self.get, url)
+                timer.count('bytes', len(content))
+        if self.cache is not None:
+            self.cache.store(url, content)
+        return content
+
+def open_pool(cache=None, replay=False, size=POOL_SIZE):
+    return ReplayPool(cache) if replay else PagePool(size=size, cache=cache)
+
+async def fetch_pages_async(requests, cache=None, replay=False):
+    async with open_pool(cache, replay, size=min(POOL_SIZE, len(requests))) as pool:
+        return await pool.fetch_all(requests)
+
+def fetch_pages(requests, cache=None, replay=False):
+    return asyncio.run(fetch_pages_async(requests, cache, replay))
+
+@timed()
+def get_website(url, ready_selector='body', cache=None, replay=False):
+    content = fetch_pages([(url, ready_selector)], cache, replay)[url]
+    if isinstance(content, Exception):
+        raise content
+    return content
+
+def schedule_url(year, base_url=SITE_URL):
+    return base_url+'/en/events/'+year+'/wm20/schedule'
+
+@timed()
+def extract_schedule_list(year, cache=None, replay=False):
+    soup_file = get_website(schedule_url(year), SCHEDULE_READY, cache, replay)
+    return parse_schedule(soup_file)
+
+def game_page_requests(url):
+    return [(url.replace('playbyplay','lineup'), LINEUP_READY), (url.replace('playbyplay','statistics'), STATISTICS_READY)]
+
+def process_game(url, lineups, stats):
+    # Returns the game's stat lines, or None when the game has not been played or its stats are not final yet
+    for page in (lineups, stats):
+        if isinstance(page, Exception):
+            raise page
+    with stage('parse_lineup_page'):
+        lineup_page = parse_lineup_page(lineups)
+    if lineup_page is None:
+        return None
+    game_winners, gwgscorer, gwg, lineups = lineup_page
+    with stage('parse_statistics_page'):
+        stats = parse_statistics_page(stats, url.replace('playbyplay','statistics'))
+    if stats is None:
+        return None
+    return combine_game(stats, game_winners, gwgscorer, gwg, lineups)
+
+@timed()
+def write_game(url, stats):
+    # Written under a temporary name first so a reader never picks up half a game file
+    path = f"{DYNAMIC_DIR}/{url.split('/')[-1]}.csv"
+    stats.to_csv(path + '.tmp', index=False)
+    os.replace(path + '.tmp', path)
+    return path
+
+@timed()
+def combine_game(stats, game_winners, gwgscorer, gwg, lineups):
+    game_gwg = game_winners.merge(stats[['name','team']])
+    game_gwg = game_gwg[game_gwg.team == gwgscorer.lower()].reset_index(drop=True)
+    game_gwg = game_gwg[game_gwg.index == gwg-1]
+    stats.loc[stats.name == game_gwg.name.values[0],'gwg'] = 1
+    stats = stats.merge(lineups,on='name',how='left')
+    stats = stats.fillna(0)
+    return stats
+
+async def fetch_new_games(to_process, cache=None, replay=False):
+    # Fetch a few games at a time so a run stops fetching soon after it reaches games that have not been played
+    async with open_pool(cache, replay) as pool:
+        for start in range(0, len(to_process), GAME_BATCH):
+            batch = to_process[start:start+GAME_BATCH]
+            pages = await pool.fetch_all([request for url in batch for request in game_page_requests(url)])
+            for url in batch:
+                try:
+                    stats = process_game(url, pages[url.replace('playbyplay','lineup')], pages[url.replace('playbyplay','statistics')])
+                    if stats is None:
+                        print(url)
+                        return
+                    write_game(url, stats)
+                except Exception as e:
+                    print(f"Error processing {url}: {e}")
+
+@timed()
+def run_pipeline(replay=False):
     current_year = '2026'
-    schedule_list = extract_schedule_list(current_year)
+    cache = HtmlCache()
+    schedule_list = extract_schedule_list(current_year, cache, replay)
     schedule_list = [x for x in schedule_list if "playbyplay" in x]
+    save_schedule(current_year, [url.split('/')[-1] for url in schedule_list])
 
-    # Check which games we already have in the dynamic folder
-    completed = [x.replace(".csv", "") for x in os.listdir(DYNAMIC_DIR) if ".csv" in x]
-    to_process = [url for url in schedule_list if not any(name in url.split('/')[-1] for name in completed)]
-
-    print(f"Found {len(to_process)} new games.")
-
-    for url in to_process:
-        try:
-            temp_url = url
-            temp_url_lineup = temp_url.replace('playbyplay','lineup')
-            temp_url_statistics = temp_url.replace('playbyplay','statistics')
-            lineups = get_website(temp_url_lineup)
-            lineups_soup = BeautifulSoup(lineups,'html.parser')
-            if lineups_soup.find('title').text == "IIHF Error page":
-                print(url)
-                break
-            else:
-                game_winners, gwgscorer, gwg = extract_game_winners(lineups_soup)
-                lineups = extract_game_lineups(lineups_soup)
-                stats = get_website(temp_url_statistics)
-                stats_soup = BeautifulSoup(stats,'html.parser')
-                if ((len(stats_soup.find('div',{'class':'m-gc-statistics'}).find_all('div',{'class':'s-filter-item'})) < 4) | 
-                    (stats_soup.find('title').text == "IIHF Error page")):
-                    print(url)
-                    break
-                else:
-                    stats = extract_game_stats(stats_soup,temp_url_statistics)
-                    game_gwg = game_winners.merge(stats[['name','team']])
-                    game_gwg = game_gwg[game_gwg.team == gwgscorer.lower()].reset_index(drop=True)
-                    game_gwg = game_gwg[game_gwg.index == gwg-1]
-                    stats.loc[stats.name == game_gwg.name.values[0],'gwg'] = 1
-                    stats = stats.merge(lineups,on='name',how='left')
-                    stats = stats.fillna(0)
-                    stats.to_csv(f"{DYNAMIC_DIR}/{url.split('/')[-1]}.csv", index=False)
-            pass
-        except Exception as e:
-            print(f"Error processing {url}: {e}")
-    all_files = [f"{DYNAMIC_DIR}/{f}" for f in os.listdir(DYNAMIC_DIR) if f.endswith('.csv')]
-    if all_files:
-        stats_full = pd.concat([pd.read_csv(f) for f in all_files])
-        stats_full = stats_full[stats_full.pos != 'GK']
-        stats_full['FP'] = (stats_full.g*1.5+ stats_full.a+ stats_full.gwg*3)
-        total_spm = stats_full.sog.sum() / (stats_full.game_id.max() * 2 * 60)
-        stats_full['minutes'] = stats_full.tot.str.split(':').str[0].astype('int') + stats_full.tot.str.split(':').str[1].astype('int')/60
-        stats_full['team_spma'] = (stats_full.groupby(['team','game_id']).sog.transform('sum') / (stats_full.groupby(['team','game_id']).minutes.transform('sum') / 6))
-        stats_full['OGS'] = stats_full.g * 0.75 + stats_full.a * 0.625 + stats_full.ts * 0.075
-        stats_full['DGS'] = stats_full['+/-'] * 0.15 + (total_spm - stats_full.team_spma) * stats_full.minutes * 0.05
-        stats_full.loc[stats_full.pos == 'D','DGS'] *= 1.5
-        stats_full.loc[stats_full.pos == 'F','DGS'] *= 0.75
-        stats_full['GGS'] = stats_full.svs * 0.1 - stats_full.ga * 0.75
-        stats_full.loc[stats_full.pos == 'GK','DGS'] = 0
-        stats_full['GS'] = stats_full.OGS + stats_full.DGS + stats_full.GGS
-        stats_full = stats_full.drop(columns='team_spma')
-        stats_full.to_csv(MASTER_FILE, index=False)
-        print(f"Pipeline Complete: {MASTER_FILE} updated.")
-
-def transform_final_dataset():
-    dynamic_master_path = 'data/dynamic/Final_Master_Dataset.csv'
-    if os.path.exists(dynamic_master_path):
-        print(f"Loading existing data from {dynamic_master_path}")
-        current = pd.read_csv(dynamic_master_path)
+    if replay:
+        # Re-parse every cached game so parser fixes reach games that are already in the dynamic folder
+        to_process = schedule_list
     else:
-        print("First run: Final_Master_Dataset.csv not found. Creating empty template.")
-        current = pd.DataFrame(columns=['year','name','game_id'])
-    historical = pd.read_csv('data/static/Stats_Historical.csv')
-    rosters = pd.read_csv('data/static/Rosters_Full.csv')
-    draft = pd.read_csv('data/static/DraftResults.txt',index_col=False) 
+        # Check which games we already have in the dynamic folder
+        completed = {x.replace(".csv", "") for x in os.listdir(DYNAMIC_DIR) if x.endswith(".csv")}
+        to_process = [url for url in schedule_list if url.split('/')[-1] not in completed]
 
-    cols_to_drop = ['Pos','Pos_ID','Unnamed: 0.1','Unnamed: 0','tot','shf']
-    current = current.drop(columns=[c for c in cols_to_drop if c in current.columns])
-    historical = historical.drop(columns=[c for c in historical.columns if 'Unnamed' in c])
-    
-    current = current[~current.year.isin(historical.year.unique())]
-    stats = pd.concat((current, historical))
+    print(f"Found {len(to_process)} {'cached' if replay else 'new'} games.")
+
+    if to_process:
+        with stage('fetch_new_games', games=len(to_process)):
+            asyncio.run(fetch_new_games(to_process, cache, replay))
+    if not replay:
+        cache.prune()
+        cache.save()
+    update_current_stats()
+
+@timed()
+def score_games(stats_full, rules=DEFAULT_RULES):
+    # Everything that only depends on the game itself; DGS waits for the tournament-wide shot rate
+    stats_full = stats_full[stats_full.pos != 'GK'].copy()
+    stats_full['FP'] = weighted_sum(stats_full, rules['FP'])
+    stats_full['minutes'] = stats_full.tot.str.split(':').str[0].astype('int') + stats_full.tot.str.split(':').str[1].astype('int')/60
+    stats_full['team_spma'] = team_shot_rate(stats_full)
+    stats_full['OGS'] = weighted_sum(stats_full, rules['OGS'])
+    stats_full['DGS'] = np.nan
+    stats_full['GGS'] = weighted_sum(stats_full, rules['GGS'])
+    stats_full['GS'] = np.nan
+    return stats_full
+
+@timed()
+def apply_total_spm(stats_full, total_spm, rules=DEFAULT_RULES):
+    stats_full['DGS'] = defensive_game_score(stats_full, total_spm, rules)
+    stats_full['GS'] = stats_full.OGS + stats_full.DGS + stats_full.GGS
+    return stats_full
+
+@timed()
+def update_current_stats():
+    # Re-score only the game files whose content changed since the last run, keyed by game id in the manifest
+    manifest = load_manifest()
+    games = manifest['games'] if os.path.exists(CY_SCORED_FILE) else {}
+    files = {f.split('-')[0]: f for f in os.listdir(DYNAMIC_DIR) if f.endswith('.csv') and f.split('-')[0].isdigit()}
+    digests = {game_id: file_sha256(f"{DYNAMIC_DIR}/{f}") for game_id, f in files.items()}
+    changed = [game_id for game_id in files if games.get(game_id, {}).get('sha256') != digests[game_id]]
+    removed = [game_id for game_id in games if game_id not in files]
+    if not changed and not removed:
+        print("Pipeline Complete: no game files changed.")
+        return False
+    if not files:
+        # Every game file is gone: drop the scored table too, so the master is rebuilt without the current year
+        os.remove(CY_SCORED_FILE)
+        manifest['games'], manifest['totals'] = {}, {}
+        save_manifest(manifest)
+        print(f"Pipeline Complete: 0 games re-scored, {len(removed)} removed.")
+        return True
+
+    scored = pd.read_parquet(CY_SCORED_FILE) if games else pd.DataFrame()
+    if len(scored):
+        scored = scored[~scored.game_id.astype(str).isin(changed + removed)]
+    with stage('read_game_files', games=len(changed)):
+        new = pd.concat([pd.read_csv(f"{DYNAMIC_DIR}/{files[game_id]}") for game_id in changed]) if changed else pd.DataFrame()
+    new = score_games(new) if changed else new
+
+    for game_id in removed:
+        del games[game_id]
+    for game_id in changed:
+        rows = new[new.game_id == int(game_id)]
+        games[game_id] = {'file': files[game_id], 'sha256': digests[game_id], 'rows': len(rows), 'sog': float(rows.sog.sum())}
+
+    # Running totals replace the old full rescan for the shot rate every DGS depends on
+    total_sog = sum(game['sog'] for game in games.values())
+    max_game_id = max(int(game_id) for game_id in games)
+    total_spm = total_sog / (max_game_id * 2 * 60)
 
-    rosters = rosters.drop(columns=[c for c in rosters.columns if 'Unnamed' in c])
-    stats = stats.merge(rosters, how='left')
-    df = stats.merge(draft, how='left')
+    stats_full = pd.concat([x for x in (scored, new) if len(x)]).sort_values('game_id', kind='stable')
+    stats_full = apply_total_spm(stats_full, total_spm)
+    with stage('write_scored', rows=len(stats_full)):
+        write_parquet(stats_full, CY_SCORED_FILE)
 
+    manifest['games'] = games
+    manifest['totals'] = {'sog': total_sog, 'max_game_id': max_game_id, 'total_spm': total_spm}
+    save_manifest(manifest)
+    print(f"Pipeline Complete: {len(changed)} games re-scored, {len(removed)} removed.")
+    return True
+
+def lookup_rows(stats, table, keys):
+    # Position in table of each stat line's key (-1 if absent). The MultiIndex factorizes the keys into integer codes
+    # once, and a table that isn't unique on its keys is rejected, as merge(validate='m:1') would
+    index = pd.MultiIndex.from_frame(table[keys])
+    if not index.is_unique:
+        raise pd.errors.MergeError(f"Duplicate {keys} rows in a static table: {index[index.duplicated()].unique().tolist()}")
+    return index.get_indexer(pd.MultiIndex.from_frame(stats[keys]))
+
+def join_static(stats, rosters, draft):
+    # Left join on explicit keys. Names repeat within a year (two AHO Sebastians in 2016), so roster rows are keyed on
+    # team as well. Matched rows are gathered by position instead of merged, which skips the hash join and its copies
+    stats = stats.reset_index(drop=True)
+    columns = [stats]
+    for name, table, keys in (('rosters', rosters, ROSTER_KEYS), ('draft', draft, DRAFT_KEYS)):
+        with stage('join_' + name, rows=len(stats)) as timer:
+            rows = lookup_rows(stats, table, keys)
+            timer.count('matched', int((rows >= 0).sum()))
+            columns.append(table.drop(columns=keys).reset_index(drop=True).reindex(rows).reset_index(drop=True))
+    df = pd.concat(columns, axis=1)
     df.loc[(~df.fantasyplayer.isna()) & (df.game_start > df.game_id), 'fantasyplayer'] = np.nan 
+    # Created up front so an empty current year (no game files yet, or all removed) still gets the column
+    df['draft_type'] = pd.Series(np.nan, index=df.index, dtype=object)
     df.loc[df.game_start == 0, 'draft_type'] = 'Initial'
     df.loc[(df.game_start >= 25) & ~(df.fantasyplayer.isna()), 'draft_type'] = 'Secondary'
-    df = df.fillna('')
+    return df
+
+def write_aggregates(master_digest):
+    with stage('build_aggregates'):
+        df = load_dataset(master_digest)
+        save_aggregates(build_aggregates(df, master_digest, load_schedule(df['year'].max())))
+    print("Aggregate bundle created: data/dynamic/Aggregates.pkl")
+
+@timed()
+def transform_final_dataset():
+    manifest = load_manifest()
+    previous = manifest['transform']
+    state = {'version': TRANSFORM_VERSION, 'current': file_sha256(CY_SCORED_FILE) if os.path.exists(CY_SCORED_FILE) else None,
+             'static': {path: file_sha256(path) for path in (HISTORICAL_FILE, ROSTERS_FILE, DRAFT_FILE)}}
+    # The bundle also depends on its own layout and on the schedule the projection reads
+    bundle_state = {'version': AGGREGATES_VERSION, 'schedule': file_sha256(SCHEDULE_FILE) if os.path.exists(SCHEDULE_FILE) else None}
+    master_digest = previous.get('master_sha256')
+    if state == previous.get('inputs') and os.path.exists(MASTER_FILE) and file_sha256(MASTER_FILE) == master_digest:
+        if bundle_state == previous.get('aggregates') and load_aggregates(master_digest) is not None:
+            print(f"{MASTER_FILE} is up to date.")
+            return
+        print(f"{MASTER_FILE} is up to date; rebuilding its aggregate bundle.")
+        write_aggregates(master_digest)
+        manifest['transform']['aggregates'] = bundle_state
+        save_manifest(manifest)
+        return
+
+    if state['current'] is not None:
+        print(f"Loading current-year data from {CY_SCORED_FILE}")
+        current = pd.read_parquet(CY_SCORED_FILE)
+    else:
+        print("First run: no scored current-year games found. Creating empty template.")
+        current = pd.DataFrame({'year': pd.Series(dtype='int64'), 'team': pd.Series(dtype='str'), 'name': pd.Series(dtype='str'),
+                                'game_id': pd.Series(dtype='int64')})
+    with stage('read_static'):
+        rosters = pd.read_csv(ROSTERS_FILE)
+        draft = pd.read_csv(DRAFT_FILE,index_col=False) 
+        rosters = rosters.drop(columns=[c for c in rosters.columns if 'Unnamed' in c])
+
+    # The historical half only changes with the static files and the join code, so its joined form is cached between runs
+    previous_inputs = previous.get('inputs', {})
+    if (state['static'], state['version']) == (previous_inputs.get('static'), previous_inputs.get('version')) \
+            and os.path.exists(HISTORICAL_JOINED_FILE):
+        historical = pd.read_parquet(HISTORICAL_JOINED_FILE)
+    else:
+        historical = pd.read_csv(HISTORICAL_FILE)
+        historical = historical.drop(columns=[c for c in historical.columns if 'Unnamed' in c])
+        with stage('join_static', part='historical'):
+            historical = join_static(historical, rosters, draft)
+        write_parquet(historical, HISTORICAL_JOINED_FILE)
+
+    cols_to_drop = ['Pos','Pos_ID','Unnamed: 0.1','Unnamed: 0','tot','shf','team_spma']
+    current = current.drop(columns=[c for c in cols_to_drop if c in current.columns])
+    current = current[~current.year.isin(historical.year.unique())]
+    with stage('join_static', part='current'):
+        current = join_static(current, rosters, draft)
+
+    # Kept typed end to end: missing values are written as empty fields, so numerics stay numeric for every reader
+    df = pd.concat((current, historical), ignore_index=True)
+    # The app keys everything on the master file's hash, so the snapshot and aggregates tagged with the new hash are
+    # written first and the CSV is swapped in last: a running app sees either the old dataset or the complete new one
+    with stage('write_master_csv', rows=len(df)):
+        df.to_csv(MASTER_FILE + '.tmp', index=False)
+        master_digest = file_sha256(MASTER_FILE + '.tmp')
+    with stage('write_snapshot'):
+        write_snapshot(df, master_digest)
+    print("Columnar snapshot created: data/dynamic/Final_Master_Dataset.parquet")
+    write_aggregates(master_digest)
+    os.replace(MASTER_FILE + '.tmp', MASTER_FILE)
+    print(f"Final visualization dataset created: {MASTER_FILE}")
 
-    df.to_csv('data/dynamic/Final_Master_Dataset.csv', index=False)
-    print("Final visualization dataset created: data/dynamic/Final_Master_Dataset.csv")
+    manifest['transform'] = {'inputs': state, 'aggregates': bundle_state, 'master_sha256': master_digest}
+    save_manifest(manifest)
 
 if __name__ == "__main__":
-    run_pipeline() 
-    transform_final_dataset()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--replay', action='store_true', help='rebuild from the raw HTML cache without fetching anything')
+    args = parser.parse_args()
+    with profiled('scraper'):
+        run_pipeline(replay=args.replay)
+        transform_final_dataset()
\ No newline at end of file
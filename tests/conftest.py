@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# The modules import each other flat from src, as app.py and the scripts in src see them; benchmarks holds the
+# synthetic data generator
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(REPO_DIR, 'src'), os.path.join(REPO_DIR, 'benchmarks')]
+
+@pytest.fixture
+def data_tree(tmp_path, monkeypatch):
+    # A small synthetic data/ tree as the working directory, since the pipeline resolves its paths against it
+    from synthetic import write_data_tree
+    write_data_tree(tmp_path, years=8, managers=2, games=12)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
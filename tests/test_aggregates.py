@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import filter_records, page_records
+
+def tied_records(n=1000, seed=0):
+    # Half-point scores like the real record book, so most values are tied, plus a few missing ones
+    rng = np.random.default_rng(seed)
+    fpoints = rng.integers(0, 12, n) / 2
+    fpoints[rng.choice(n, n // 50, replace=False)] = np.nan
+    return pd.DataFrame({'name': [f"player {i}" for i in range(n)], 'team': rng.choice(['can', 'swe', 'usa'], n),
+                         'FPoints': fpoints})
+
+@pytest.mark.parametrize('page_size', [1, 7, 50, 1000, 2000])
+@pytest.mark.parametrize('team', [None, 'swe'])
+def test_pages_are_a_permutation_of_the_filtered_rows(page_size, team):
+    records = tied_records()
+    rows = filter_records(records, {'team': team})
+    n_pages = max(1, -(-len(rows) // page_size))
+    pages = [page_records(records, rows, 'FPoints', page, page_size) for page in range(n_pages)]
+    paged = pd.concat(pages)
+
+    assert sorted(paged.index) == sorted(records.index[rows])
+    assert all(len(page) == page_size for page in pages[:-1])
+    # Descending with missing values last, ties in row order: the same order as one stable sort of every row
+    expected = records.iloc[rows].sort_values('FPoints', ascending=False, kind='stable', na_position='last')
+    assert paged.index.tolist() == expected.index.tolist()
+
+def test_page_past_the_end_is_empty():
+    records = tied_records(10)
+    assert page_records(records, filter_records(records), page=3, page_size=5).empty
+    assert page_records(records, filter_records(records, {'team': 'fin'}), page=0).empty
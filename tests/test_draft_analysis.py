@@ -0,0 +1,41 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from draft_analysis import best_roster
+
+SLOTS = {'F': 3, 'D': 2, 'GK': 1}
+
+def exhaustive_best(points, teams, positions, slots, max_per_team):
+    # Every way of filling each position's slots, keeping the best total within the country cap
+    by_position = [itertools.combinations(np.flatnonzero(positions == pos), n) for pos, n in slots.items()]
+    best = -np.inf
+    for picks in itertools.product(*[list(combos) for combos in by_position]):
+        roster = [row for group in picks for row in group]
+        if np.unique(teams[roster], return_counts=True)[1].max() <= max_per_team:
+            best = max(best, points[roster].sum())
+    return best
+
+def pool(seed, n=16):
+    # The strongest players crowd into one country, so the cap decides who makes the roster
+    rng = np.random.default_rng(seed)
+    teams = rng.choice(['can', 'usa', 'swe', 'fin'], n, p=[0.55, 0.15, 0.15, 0.15])
+    points = rng.integers(0, 20, n).astype(float) + np.where(teams == 'can', 10, 0)
+    positions = np.array(['F'] * 7 + ['D'] * 6 + ['GK'] * 3)[rng.permutation(n)]
+    return points, teams, positions
+
+# Caps 2 and 3 bind on every seed (the best roster under them scores less than with 6)
+@pytest.mark.parametrize('max_per_team', [1, 2, 3, 6])
+@pytest.mark.parametrize('seed', range(5))
+def test_best_roster_matches_an_exhaustive_search(seed, max_per_team):
+    points, teams, positions = pool(seed)
+    roster = best_roster(points, teams, positions, SLOTS, max_per_team)
+    expected = exhaustive_best(points, teams, positions, SLOTS, max_per_team)
+    if expected == -np.inf:
+        # Four countries at one player each can't fill six slots; the solver stops at what it could fill
+        assert len(roster) < sum(SLOTS.values())
+        return
+    assert sorted(positions[roster].tolist()) == sorted(pos for pos, n in SLOTS.items() for _ in range(n))
+    assert np.unique(teams[roster], return_counts=True)[1].max() <= max_per_team
+    assert points[roster].sum() == expected
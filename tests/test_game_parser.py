@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+from lxml import html as lxml_html
+
+import scraper
+from legacy_parser import legacy_parse
+from parser_benchmark import game_parser_parse
+from synthetic import TEAMS, game_pages
+
+def assert_parsers_agree(url, lineup, stats):
+    expected = scraper.combine_game(*legacy_parse(url, lineup, stats))
+    actual = scraper.combine_game(*game_parser_parse(url, lineup, stats))
+    pd.testing.assert_frame_equal(expected.reset_index(drop=True), actual.reset_index(drop=True),
+                                  check_dtype=False, check_column_type=False, check_names=False)
+
+# Markup the synthetic pages don't have but a real page may: each variant rewrites every statistics table, and
+# game_parser has to read it the way read_html does
+def edit_tables(page, edit):
+    root = lxml_html.fromstring(page)
+    for block in root.find_class('m-statistics-table'):
+        for i, table in enumerate(block.iter('table')):
+            edit(table, i % 2 == 0)
+    return lxml_html.tostring(root, encoding='unicode')
+
+def header_rows_in_body(table, fixed):
+    # No <thead>: the header is the leading row of <th> cells
+    thead = table.find('thead')
+    tbody = table.find('tbody')
+    for tr in thead:
+        tbody.insert(0, tr)
+    table.remove(thead)
+
+def totals_in_tfoot(table, fixed):
+    width = len(table.find('thead').find('tr'))
+    cells = ['', '', 'TOTAL', ''] if fixed else ['1,024'] + ['N/A'] * (width - 1)
+    tfoot = lxml_html.fromstring('<table><tfoot><tr>' + ''.join(f'<td>{c}</td>' for c in cells) + '</tr></tfoot></table>').find('tfoot')
+    table.append(tfoot)
+
+def spanned_cells(table, fixed):
+    # The blank and jersey headers merged with colspan, and the first two players' position cell spanning both rows
+    if fixed:
+        header = table.find('thead').find('tr')
+        header[0].set('colspan', '2')
+        header.remove(header[1])
+        rows = table.find('tbody').findall('tr')
+        if len(rows) >= 2 and rows[0][3].text == rows[1][3].text:
+            rows[0][3].set('rowspan', '2')
+            rows[1].remove(rows[1][3])
+
+def padded_text(table, fixed):
+    for cell in table.iter('td', 'th'):
+        if cell.text:
+            cell.text = f"\n    {cell.text.replace(' ', '  ')}\n  "
+
+def missing_rows(table, fixed):
+    # The scroll table one row short of its fixed half
+    if not fixed:
+        table.find('tbody').remove(table.find('tbody').findall('tr')[-1])
+
+VARIANTS = [header_rows_in_body, totals_in_tfoot, spanned_cells, padded_text, missing_rows]
+
+@pytest.mark.parametrize('variant', VARIANTS, ids=[v.__name__ for v in VARIANTS])
+@pytest.mark.parametrize('game', range(3))
+def test_markup_variants(variant, game):
+    url, lineup, stats = game_pages(game, game + 1, TEAMS[game], TEAMS[game + 3])
+    assert_parsers_agree(url, lineup, edit_tables(stats, variant))
@@ -0,0 +1,78 @@
+import asyncio
+import os
+import shutil
+import threading
+
+import pandas as pd
+import pytest
+
+import live
+from datastore import MASTER_FILE
+from html_cache import HtmlCache
+from live import LiveUpdater, RecordedSite, completed_games, serve
+from scraper import DYNAMIC_DIR, HttpPool
+from synthetic import record_tournament
+
+N_GAMES = 4
+
+@pytest.fixture
+def stand_in_site(data_tree):
+    # The recorded tournament replayed on an ephemeral port: one game over at the start, then one starting every
+    # 0.3 seconds and going final 0.2 seconds later. The poller starts from an empty current-year folder.
+    shutil.rmtree(DYNAMIC_DIR)
+    os.makedirs(DYNAMIC_DIR)
+    site_cache = HtmlCache(os.path.join(data_tree, 'site'))
+    urls = record_tournament(site_cache, N_GAMES)
+    server = serve(RecordedSite(site_cache, release_every=0.3, released=1, live_for=0.2), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", urls
+    server.shutdown()
+    server.server_close()
+
+def watch(base_url, cache_dir):
+    async def run():
+        async with HttpPool(size=4) as pool:
+            updater = LiveUpdater(pool, HtmlCache(cache_dir), '2026', base_url, live_interval=0.05, idle_interval=0.2)
+            await updater.run(max_seconds=60)
+    asyncio.run(run())
+
+def test_publishes_every_game_as_it_goes_final(stand_in_site, data_tree):
+    base_url, urls = stand_in_site
+    watch(base_url, os.path.join(data_tree, 'poller'))
+
+    assert completed_games() == {url.split('/')[-1] for url in urls}
+    master = pd.read_csv(MASTER_FILE)
+    assert sorted(master.loc[master['year'] == 2026, 'game_id'].unique()) == list(range(1, N_GAMES + 1))
+
+def test_game_that_fails_to_parse_is_retried(stand_in_site, data_tree, monkeypatch):
+    base_url, urls = stand_in_site
+    failing = urls[1].replace(live.SITE_URL, base_url)
+    failures = []
+    process_game = live.process_game
+    def flaky_process_game(url, lineup, stats):
+        if url == failing and len(failures) < 2:
+            failures.append(url)
+            raise ValueError("unexpected markup")
+        return process_game(url, lineup, stats)
+    monkeypatch.setattr(live, 'process_game', flaky_process_game)
+    watch(base_url, os.path.join(data_tree, 'poller'))
+
+    assert len(failures) == 2
+    assert completed_games() == {url.split('/')[-1] for url in urls}
+
+def test_failed_publish_is_retried(stand_in_site, data_tree, monkeypatch):
+    base_url, urls = stand_in_site
+    failures = []
+    transform_final_dataset = live.transform_final_dataset
+    def flaky_transform():
+        if len(failures) < 2:
+            failures.append(1)
+            raise pd.errors.MergeError("Duplicate rows in a static table")
+        return transform_final_dataset()
+    monkeypatch.setattr(live, 'transform_final_dataset', flaky_transform)
+    watch(base_url, os.path.join(data_tree, 'poller'))
+
+    assert len(failures) == 2
+    master = pd.read_csv(MASTER_FILE)
+    assert sorted(master.loc[master['year'] == 2026, 'game_id'].unique()) == list(range(1, N_GAMES + 1))
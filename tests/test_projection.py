@@ -0,0 +1,10 @@
+import pandas as pd
+
+from projection import remaining_schedule
+
+def test_placeholder_slugs_count_as_undecided_games():
+    cy_df = pd.DataFrame({'game_id': [1, 2], 'team': ['ger', 'den']})
+    schedule = ['1-ger-vs-den', '21-ger-vs-den', '22-qf1-vs-qf8', '23-a1-vs-b4', '24-tbd-vs-tbd', '25-ger-vs-swe']
+    fixed, undecided = remaining_schedule(cy_df, ['den', 'ger'], schedule)
+    assert fixed.tolist() == [1, 1]
+    assert undecided == 4
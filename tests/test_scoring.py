@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import scraper
+from datastore import MASTER_FILE, file_sha256, load_dataset
+from scoring import DEFAULT_RULES, compare_rules, load_rules, score
+
+from conftest import REPO_DIR
+
+# The stored 2005-2025 DGS was scored against one fixed tournament shot rate rather than each tournament's own, which
+# moves a row by at most about 0.14
+DGS_TOLERANCE = 0.15
+
+@pytest.fixture
+def master(data_tree):
+    scraper.update_current_stats()
+    scraper.transform_final_dataset()
+    return load_dataset(file_sha256(MASTER_FILE))
+
+def test_standings_score_every_row_before_dropping_the_undrafted(master):
+    # DGS leans on team and tournament shot rates, which the undrafted players' shots are part of
+    scored = score(master)
+    drafted = scored[scored['Draftee'].notna() & (scored['Draftee'] != 'Undrafted')]
+    expected = drafted.groupby(['year', 'Draftee'], observed=True)['DGS'].sum()
+    table = compare_rules(master, DEFAULT_RULES, points='DGS').set_index(['year', 'Draftee'])
+    np.testing.assert_allclose(table['DGS'], expected.reindex(table.index))
+
+def test_standings_follow_the_chosen_metric(master):
+    rules = load_rules(overrides={'OGS': {'g': 3}})
+    table = compare_rules(master, rules)
+    assert (table['FPoints_whatif'] == table['FPoints']).all()
+    table = compare_rules(master, rules, points='OGS')
+    assert (table['OGS_whatif'] > table['OGS']).any()
+
+def test_position_weights_are_set_one_at_a_time():
+    rules = load_rules(overrides={'DGS': {'pos': {'D': 2}}})
+    assert rules['DGS']['pos'] == {'D': 2, 'F': 0.75, 'GK': 0}
+    with pytest.raises(ValueError, match='table of weights'):
+        load_rules(overrides={'DGS': {'pos': 2}})
+
+def test_rescoring_the_history_reproduces_the_stored_scores():
+    history = pd.read_csv(os.path.join(REPO_DIR, 'data', 'static', 'Stats_Historical.csv'))
+    scored = score(history)
+    season_totals = history['matchup'].str.endswith('-all')
+    assert season_totals.any()
+    for year, rows in history.groupby('year'):
+        for metric in ('FP', 'OGS', 'GGS', 'DGS', 'GS'):
+            tolerance = DGS_TOLERANCE if metric in ('DGS', 'GS') and not season_totals[rows.index].all() else 1e-9
+            np.testing.assert_allclose(scored.loc[rows.index, metric], rows[metric], atol=tolerance, err_msg=f"{metric} {year}")
@@ -0,0 +1,55 @@
+import os
+
+import pandas as pd
+
+import scraper
+from aggregates import AGGREGATES_FILE, load_aggregates
+from datastore import CY_SCORED_FILE, MANIFEST_FILE, MASTER_FILE, file_sha256, load_manifest, save_manifest, save_schedule
+
+def build():
+    scraper.update_current_stats()
+    scraper.transform_final_dataset()
+
+def test_unchanged_inputs_skip_the_rebuild(data_tree, capsys):
+    build()
+    master_mtime = os.stat(MASTER_FILE).st_mtime_ns
+    build()
+    assert "is up to date." in capsys.readouterr().out
+    assert os.stat(MASTER_FILE).st_mtime_ns == master_mtime
+
+def test_missing_bundle_is_rebuilt(data_tree):
+    build()
+    os.remove(AGGREGATES_FILE)
+    build()
+    assert load_aggregates(file_sha256(MASTER_FILE)) is not None
+
+def test_schedule_change_rebuilds_the_bundle(data_tree):
+    build()
+    save_schedule(2026, ['13-can-vs-usa'])
+    bundle_mtime = os.stat(AGGREGATES_FILE).st_mtime_ns
+    build()
+    assert os.stat(AGGREGATES_FILE).st_mtime_ns != bundle_mtime
+    assert load_aggregates(file_sha256(MASTER_FILE))['projection'] is not None
+
+def test_new_bundle_layout_or_join_code_rebuilds(data_tree):
+    build()
+    manifest = load_manifest()
+    manifest['transform']['aggregates']['version'] -= 1
+    manifest['transform']['inputs']['version'] -= 1
+    save_manifest(manifest, MANIFEST_FILE)
+    historical_mtime = os.stat(scraper.HISTORICAL_JOINED_FILE).st_mtime_ns
+    build()
+    assert os.stat(scraper.HISTORICAL_JOINED_FILE).st_mtime_ns != historical_mtime
+    assert load_manifest()['transform']['inputs']['version'] == scraper.TRANSFORM_VERSION
+
+def test_removing_every_game_file_empties_the_current_year(data_tree):
+    build()
+    for name in os.listdir(scraper.DYNAMIC_DIR):
+        if name.endswith('.csv'):
+            os.remove(os.path.join(scraper.DYNAMIC_DIR, name))
+    build()
+    manifest = load_manifest()
+    assert manifest['games'] == {} and manifest['totals'] == {}
+    assert not os.path.exists(CY_SCORED_FILE)
+    master = pd.read_csv(MASTER_FILE)
+    assert 2026 not in master['year'].unique()